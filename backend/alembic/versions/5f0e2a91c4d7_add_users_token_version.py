@@ -0,0 +1,26 @@
+"""add_users_token_version
+
+Revision ID: 5f0e2a91c4d7
+Revises: c76dbb3346da
+Create Date: 2026-10-17 16:40:12.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0e2a91c4d7'
+down_revision: Union[str, None] = 'c76dbb3346da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,28 @@
+"""add_tickets_keyset_indexes
+
+Revision ID: 8b3d6c0e5a12
+Revises: 5f0e2a91c4d7
+Create Date: 2026-10-17 17:05:41.532870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3d6c0e5a12'
+down_revision: Union[str, None] = '5f0e2a91c4d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tickets_created_at_id', 'tickets', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_assignee_created_at_id', 'tickets', ['assignee_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_assignee_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_created_at_id', table_name='tickets')
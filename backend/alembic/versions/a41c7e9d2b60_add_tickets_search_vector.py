@@ -0,0 +1,37 @@
+"""add_tickets_search_vector
+
+Revision ID: a41c7e9d2b60
+Revises: 8b3d6c0e5a12
+Create Date: 2026-10-17 17:31:09.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7e9d2b60'
+down_revision: Union[str, None] = '8b3d6c0e5a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        ALTER TABLE tickets ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple'::regconfig, coalesce(key, '')), 'A') ||
+            setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'B') ||
+            setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'C')
+        ) STORED
+    """)
+    op.execute("CREATE INDEX ix_tickets_search_vector ON tickets USING gin (search_vector)")
+    op.execute("CREATE INDEX ix_tickets_key_pattern ON tickets (key text_pattern_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_key_pattern', table_name='tickets')
+    op.drop_index('ix_tickets_search_vector', table_name='tickets')
+    op.drop_column('tickets', 'search_vector')
@@ -0,0 +1,29 @@
+"""switch_tickets_title_trgm_to_gist
+
+Revision ID: b7e3d9f1a5c8
+Revises: f4a9c1d7e862
+Create Date: 2026-10-18 11:02:37.418025
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3d9f1a5c8'
+down_revision: Union[str, None] = 'f4a9c1d7e862'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GiST поддерживает KNN-сортировку title <-> q, GIN — нет
+    op.drop_index('ix_tickets_title_trgm', table_name='tickets')
+    op.execute("CREATE INDEX ix_tickets_title_trgm ON tickets USING gist (title gist_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_title_trgm', table_name='tickets')
+    op.execute("CREATE INDEX ix_tickets_title_trgm ON tickets USING gin (title gin_trgm_ops)")
@@ -0,0 +1,27 @@
+"""add_tickets_title_trgm_index
+
+Revision ID: d93e1f4a7c25
+Revises: a41c7e9d2b60
+Create Date: 2026-10-17 17:52:44.610392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93e1f4a7c25'
+down_revision: Union[str, None] = 'a41c7e9d2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX ix_tickets_title_trgm ON tickets USING gin (title gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_title_trgm', table_name='tickets')
@@ -0,0 +1,37 @@
+"""add_notifications_unread_counter
+
+Revision ID: e2c8f4b6a931
+Revises: d93e1f4a7c25
+Create Date: 2026-10-17 19:48:03.271540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c8f4b6a931'
+down_revision: Union[str, None] = 'd93e1f4a7c25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('unread_notifications', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_notifications_user_read_created', 'notifications', ['user_id', 'is_read', 'created_at'], unique=False)
+    op.create_index('ix_notifications_user_created_id', 'notifications', ['user_id', 'created_at', 'id'], unique=False)
+    # Начальное значение счётчика — по уже существующим уведомлениям
+    op.execute("""
+        UPDATE users SET unread_notifications = (
+            SELECT count(*) FROM notifications
+            WHERE notifications.user_id = users.id AND notifications.is_read = false
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_user_created_id', table_name='notifications')
+    op.drop_index('ix_notifications_user_read_created', table_name='notifications')
+    op.drop_column('users', 'unread_notifications')
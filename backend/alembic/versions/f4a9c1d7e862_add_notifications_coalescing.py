@@ -0,0 +1,33 @@
+"""add_notifications_coalescing
+
+Revision ID: f4a9c1d7e862
+Revises: e2c8f4b6a931
+Create Date: 2026-10-17 20:31:17.904226
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c1d7e862'
+down_revision: Union[str, None] = 'e2c8f4b6a931'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notifications', sa.Column('event_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('notifications', sa.Column('last_actor_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_notifications_last_actor_id_users', 'notifications', 'users',
+        ['last_actor_id'], ['id'], ondelete='SET NULL',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_notifications_last_actor_id_users', 'notifications', type_='foreignkey')
+    op.drop_column('notifications', 'last_actor_id')
+    op.drop_column('notifications', 'event_count')
@@ -13,9 +13,74 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
     
+    TOKEN_CACHE_SIZE: int = 4096
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    
+    # Роль и версия токена внутри JWT: GET-эндпоинты авторизуются без запроса users/roles
+    TOKEN_EMBED_CLAIMS: bool = False
+    TOKEN_VERSION_CACHE_TTL_SECONDS: int = 5
+    
+    BCRYPT_ROUNDS: int = 12
+    # bcrypt — в отдельном пуле; ожидающие запросы не занимают threadpool Starlette.
+    # Сверх WORKERS + QUEUE_LIMIT одновременных хеширований — сразу 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    
+    # Предупреждение в логе, если запрос к API сделал больше SQL-запросов (0 — выключено)
+    QUERY_BUDGET_PER_REQUEST: int = 20
+    
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/app.log"
     
+    TICKETS_PAGE_MAX_LIMIT: int = 200
+    # Выше этой оценки планировщика точный COUNT(*) не выполняется
+    TICKETS_EXACT_COUNT_THRESHOLD: int = 10000
+    
+    SEARCH_MAX_LIMIT: int = 50
+    SUGGEST_MAX_LIMIT: int = 20
+    SUGGEST_CACHE_SIZE: int = 2048
+    SUGGEST_CACHE_TTL_SECONDS: int = 10
+    
+    # Кэш ответов GET-эндпоинтов заявки: memory | redis | none
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_URL: str = "redis://localhost:6379/0"
+    RESPONSE_CACHE_SIZE: int = 2048
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    
+    REFERENCE_DATA_TTL_SECONDS: int = 300
+    
+    # Ответы списков/заявки сериализуются напрямую через TypeAdapter и orjson
+    FAST_SERIALIZATION: bool = False
+    
+    EXPORT_BATCH_SIZE: int = 1000
+    BULK_MAX_KEYS: int = 5000
+    # Заявок в одной транзакции импорта (после каждой пачки — контрольная точка)
+    IMPORT_BATCH_SIZE: int = 2000
+    
+    # SSE-поток уведомлений: очередь на подключение (при переполнении — resync)
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 64
+    NOTIFICATION_STREAM_PING_SECONDS: int = 20
+    NOTIFICATION_STREAM_RETRY_MS: int = 5000
+    # Одноразовый по назначению токен для ?token= (попадает в access-логи прокси)
+    NOTIFICATION_STREAM_TOKEN_TTL_SECONDS: int = 60
+    
+    # Рассылка уведомлений в фоне после commit запроса (иначе — в транзакции запроса)
+    NOTIFICATION_FANOUT_ASYNC: bool = False
+    NOTIFICATION_FANOUT_WORKERS: int = 2
+    NOTIFICATION_FANOUT_RETRIES: int = 3
+    # Однотипные события по одной заявке за окно сворачиваются в одно непрочитанное (0 — выключено)
+    NOTIFICATION_COALESCE_WINDOW_SECONDS: int = 3600
+    NOTIFICATION_COALESCE_TYPES: str = "COMMENT"
+    
+    NOTIFICATION_PAGE_MAX_LIMIT: int = 100
+    # Прочитанные уведомления старше N дней удаляются фоновой задачей (0 — хранить всё)
+    NOTIFICATION_RETENTION_DAYS: int = 90
+    NOTIFICATION_PURGE_BATCH_SIZE: int = 1000
+    NOTIFICATION_PURGE_INTERVAL_SECONDS: int = 3600
+    
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    
     class Config:
         env_file = ".env"
         extra = "allow"
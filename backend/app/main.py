@@ -1,16 +1,24 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import time
 import os
 
 from app.config import settings
-from app.database import init_db, SessionLocal
+from app.database import engine, init_db, SessionLocal
 from app.models.user import Role, User
+from app.services.fanout import shutdown_fanout_executor
+from app.services.reference_data import invalidate_reference_data
+from app.services.retention import retention_loop
+from app.services.search import check_search_schema
 from app.utils.logger import logger
-from app.utils.security import hash_password
-from app.routers import auth, tickets, users, comments
+from app.utils.serialization import FastJSONResponse
+from app.utils.query_counter import count_queries
+from app.utils.security import hash_password, PasswordHasherBusy, shutdown_password_executor
+from app.routers import auth, tickets, users, comments, notifications
 
 
 # Создаём папку для загрузок
@@ -48,6 +56,7 @@ async def create_default_roles_and_admin():
             role_id=admin_role.id,
         ))
         db.commit()
+        invalidate_reference_data()
         logger.info("Admin user created: admin/admin")
         
     except Exception as e:
@@ -62,8 +71,14 @@ async def lifespan(app: FastAPI):
     """Lifecycle: startup и shutdown"""
     logger.info("🚀 Starting Gerask...")
     init_db()
+    check_search_schema(engine)
     await create_default_roles_and_admin()
+    retention_task = asyncio.create_task(retention_loop()) if settings.NOTIFICATION_RETENTION_DAYS else None
     yield
+    if retention_task:
+        retention_task.cancel()
+    shutdown_password_executor()
+    shutdown_fanout_executor()
     logger.info("👋 Shutting down Gerask...")
 
 
@@ -71,7 +86,8 @@ app = FastAPI(
     title="Gerask",
     version="1.0.0",
     description="Система управления заявками",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.FAST_SERIALIZATION else JSONResponse,
 )
 
 app.add_middleware(
@@ -87,17 +103,36 @@ app.add_middleware(
 async def log_requests(request: Request, call_next):
     """Логирование всех HTTP запросов"""
     start = time.time()
-    response = await call_next(request)
+    with count_queries() as queries:
+        response = await call_next(request)
     duration = round((time.time() - start) * 1000, 2)
-    logger.info(f"{request.method} {request.url.path} - {response.status_code} - {duration}ms")
+    logger.info(f"{request.method} {request.url.path} - {response.status_code} - {duration}ms - {queries.count} queries")
+    
+    budget = settings.QUERY_BUDGET_PER_REQUEST
+    if budget and queries.count > budget:
+        logger.warning(f"Query budget exceeded: {request.method} {request.url.path} - {queries.count} > {budget}")
+    if settings.DEBUG:
+        response.headers["X-Query-Count"] = str(queries.count)
     return response
 
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Очередь хеширования паролей переполнена — просим повторить позже"""
+    logger.warning(f"Password hasher queue is full: {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Сервер перегружен, повторите попытку позже"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Роутеры API
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(tickets.router, prefix="/api/tickets", tags=["Tickets"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(comments.router, prefix="/api/tickets", tags=["Comments"])
+app.include_router(notifications.router, prefix="/api/notifications", tags=["Notifications"])
 
 # Статические файлы (загрузки)
 app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -57,6 +57,12 @@ class Attachment(Base):
 class Notification(Base):
     """Уведомления пользователей"""
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Непрочитанные пользователя (отметка «прочитано», пересчёт счётчика)
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+        # Лента уведомлений: ORDER BY created_at DESC, id DESC по user_id
+        Index("ix_notifications_user_created_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -66,7 +72,10 @@ class Notification(Base):
     message = Column(Text, nullable=False)
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Сколько событий свёрнуто в это уведомление и кто был последним
+    event_count = Column(Integer, default=1, server_default="1", nullable=False)
+    last_actor_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     
-    user = relationship("User", backref="notifications")
+    user = relationship("User", backref="notifications", foreign_keys=[user_id])
     ticket = relationship("Ticket")
     comment = relationship("Comment")
\ No newline at end of file
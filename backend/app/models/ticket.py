@@ -1,7 +1,10 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, Computed, Integer, String, Text, DateTime, ForeignKey, Index, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.database import Base
 
@@ -21,8 +24,45 @@ class TicketPriority(str, Enum):
     CRITICAL = "critical"
 
 
+class search_document(FunctionElement):
+    """
+    Выражение генерируемой колонки search_vector: ключ (A), название (B),
+    описание (C), конфигурация 'simple' — как в миграции a41c7e9d2b60.
+    Вне PostgreSQL колонка пустая: там поиск идёт через FTS5 или ILIKE.
+    """
+    name = "search_document"
+    inherit_cache = True
+
+
+@compiles(search_document, "postgresql")
+def _search_document_postgresql(element, compiler, **kw):
+    return (
+        "setweight(to_tsvector('simple'::regconfig, coalesce(key, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'B') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'C')"
+    )
+
+
+@compiles(search_document)
+def _search_document_default(element, compiler, **kw):
+    return "NULL"
+
+
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Keyset-пагинация списков: ORDER BY created_at DESC, id DESC
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_assignee_created_at_id", "assignee_id", "created_at", "id"),
+        # Полнотекстовый поиск и подсказки по префиксу ключа (только PostgreSQL)
+        Index("ix_tickets_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_tickets_key_pattern", "key", postgresql_ops={"key": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+        # Подсказки по названию: GiST отдаёт ORDER BY title <-> q LIMIT n прямо из индекса
+        Index(
+            "ix_tickets_title_trgm", "title",
+            postgresql_using="gist", postgresql_ops={"title": "gist_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String(50), unique=True, nullable=False, index=True)
@@ -45,7 +85,21 @@ class Ticket(Base):
     resolved_at = Column(DateTime, nullable=True)
     deadline = Column(DateTime, nullable=True)
     
+    # Генерируемая колонка для полнотекстового поиска; в ORM-запросах не загружается
+    search_vector = deferred(Column(
+        Text().with_variant(TSVECTOR(), "postgresql"),
+        Computed(search_document(), persisted=True),
+    ))
+    
     # Связи
     author = relationship("User", foreign_keys=[author_id], backref="created_tickets")
     assignee = relationship("User", foreign_keys=[assignee_id], backref="assigned_tickets")
-    role = relationship("Role")
\ No newline at end of file
+    role = relationship("Role")
+
+
+# Операторные классы триграмм для ix_tickets_title_trgm
+event.listen(
+    Ticket.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -30,5 +30,9 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
+    # Увеличивается при смене роли/статуса — старые токены с claims становятся недействительны
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
+    # Число непрочитанных уведомлений: меняется вместе с notifications (app/services/notifications.py)
+    unread_notifications = Column(Integer, default=0, server_default="0", nullable=False)
     
     role = relationship("Role", back_populates="users")
@@ -1,14 +1,31 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database import get_db
 from app.models.user import User, Role
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
-from app.utils.security import hash_password, verify_password, create_access_token, decode_token
+from app.services.reference_data import invalidate_reference_data
+from app.services.principals import (
+    Principal,
+    load_principal,
+    load_token_state,
+    invalidate_principal,
+    build_token_claims,
+    has_embedded_claims,
+)
+from app.utils.security import (
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
+    create_access_token,
+    decode_token,
+)
 from app.utils.logger import logger, log_action
 
 
@@ -19,8 +36,8 @@ security = HTTPBearer()
 def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     db: Session = Depends(get_db)
-) -> User:
-    """Получить текущего пользователя по токену"""
+) -> Principal:
+    """Получить текущего пользователя по токену (с кэшированием)"""
     token = credentials.credentials
     payload = decode_token(token)
     
@@ -28,34 +45,69 @@ def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     
     user_id = payload.get("sub")
-    if user_id is None:
+    # Токены с scope (например, для потока уведомлений) не годятся для API
+    if user_id is None or "scope" in payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = load_principal(db, int(user_id))
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User deactivated")
     
+    if "ver" in payload and payload["ver"] != user.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    
     return user
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def get_current_claims(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Пользователь из claims токена — для GET-эндпоинтов.
+    
+    Роль берётся из токена, в БД проверяется только версия токена.
+    Токены без claims обрабатываются как в get_current_user.
+    """
+    payload = decode_token(credentials.credentials)
+    if payload is None or payload.get("sub") is None or "scope" in payload:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    
+    if not has_embedded_claims(payload):
+        return get_current_user(credentials, db)
+    
+    state = load_token_state(db, int(payload["sub"]))
+    if state is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    
+    token_version, is_active = state
+    if not is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User deactivated")
+    if payload["ver"] != token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    
+    return Principal.from_claims(payload)
+
+
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Проверка что пользователь — админ"""
     if not current_user.role.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
     return current_user
 
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    """Регистрация нового пользователя с ролью reader по умолчанию"""
-    
-    if user_data.password != user_data.password_confirm:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Passwords do not match")
-    
-    existing = db.query(User).filter(User.login == user_data.login).first()
+def require_admin_claims(current_user: Principal = Depends(get_current_claims)) -> Principal:
+    """require_admin для GET-эндпоинтов (роль из claims токена)"""
+    if not current_user.role.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+
+def _reader_role(db: Session, login: str) -> Role:
+    """Проверить, что логин свободен, и вернуть роль reader (создав её при отсутствии)"""
+    existing = db.query(User).filter(User.login == login).first()
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
     
@@ -75,44 +127,87 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(reader_role)
     
+    return reader_role
+
+
+def _save_new_user(db: Session, user: User) -> UserResponse:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    invalidate_reference_data()
+    
+    log_action(user.id, "USER_REGISTERED", {"login": user.login, "role": "reader"})
+    # Сериализуем здесь же: ленивая загрузка роли не должна идти из event loop
+    return UserResponse.model_validate(user)
+
+
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+    """Регистрация нового пользователя с ролью reader по умолчанию.
+    
+    Обработчик асинхронный: bcrypt ждём в event loop, работа с БД — в threadpool.
+    """
+    
+    if user_data.password != user_data.password_confirm:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Passwords do not match")
+    
+    reader_role = await run_in_threadpool(_reader_role, db, user_data.login)
+    
     user = User(
         login=user_data.login,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hash_password_async(user_data.password),
         display_name=user_data.display_name or user_data.login,
         role_id=reader_role.id,
     )
+    return await run_in_threadpool(_save_new_user, db, user)
+
+
+def _find_user(db: Session, login: str):
+    return db.query(User).filter(User.login == login).first()
+
+
+def _complete_login(db: Session, user: User, new_hash: Optional[str]) -> str:
+    """Отметить вход (и сохранить пересчитанный хеш), выдать токен"""
+    if new_hash is not None:
+        user.password_hash = new_hash
     
-    db.add(user)
+    user.last_login = datetime.utcnow()
     db.commit()
-    db.refresh(user)
+    invalidate_principal(user.id)
     
-    log_action(user.id, "USER_REGISTERED", {"login": user.login, "role": "reader"})
-    return user
+    if settings.TOKEN_EMBED_CLAIMS:
+        access_token = create_access_token(data=build_token_claims(user))
+    else:
+        access_token = create_access_token(data={"sub": str(user.id)})
+    log_action(user.id, "LOGIN_SUCCESS", {"login": user.login})
+    
+    return access_token
 
 
 @router.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
-    """Авторизация пользователя"""
+async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+    """Авторизация пользователя (bcrypt — в выделенном пуле, БД — в threadpool)"""
     
-    user = db.query(User).filter(User.login == user_data.login).first()
+    user = await run_in_threadpool(_find_user, db, user_data.login)
     
-    if not user or not verify_password(user_data.password, user.password_hash):
+    if not user or not await verify_password_async(user_data.password, user.password_hash):
         log_action(None, "LOGIN_FAILED", {"login": user_data.login})
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid login or password")
     
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User deactivated")
     
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Пересчитываем хеш, если изменилась стоимость bcrypt
+    new_hash = None
+    if password_needs_rehash(user.password_hash):
+        new_hash = await hash_password_async(user_data.password)
     
-    access_token = create_access_token(data={"sub": str(user.id)})
-    log_action(user.id, "LOGIN_SUCCESS", {"login": user.login})
+    access_token = await run_in_threadpool(_complete_login, db, user, new_hash)
     
     return Token(access_token=access_token)
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: Principal = Depends(get_current_user)):
     """Получить данные текущего пользователя"""
     return current_user
\ No newline at end of file
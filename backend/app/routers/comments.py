@@ -1,10 +1,9 @@
 from typing import List
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 import os
 import uuid
-import re
 
 from app.database import get_db
 from app.models.user import User
@@ -12,6 +11,15 @@ from app.models.ticket import Ticket
 from app.models.comment import Comment, TicketHistory, Attachment, Notification
 from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse, HistoryResponse, NotificationResponse
 from app.routers.auth import get_current_user
+from app.services.fanout import NotificationEvent, notify
+from app.services.mentions import resolve_mentions
+from app.services.notifications import (
+    count_unread,
+    read_all_notifications,
+    read_notification,
+    retract_comment_notifications,
+)
+from app.services.response_cache import invalidate_ticket
 
 
 router = APIRouter()
@@ -20,39 +28,6 @@ UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
-def parse_mentions(content: str, db: Session) -> List[User]:
-    """Находит @упоминания в тексте и возвращает список пользователей"""
-    # Ищем паттерны @Имя или @[Имя Фамилия]
-    pattern = r'@\[([^\]]+)\]|@(\w+)'
-    matches = re.findall(pattern, content)
-    
-    mentioned_users = []
-    for match in matches:
-        name = match[0] or match[1]  # Берём то, что нашлось
-        # Ищем пользователя по display_name или login
-        user = db.query(User).filter(
-            (User.display_name.ilike(f"%{name}%")) | (User.login.ilike(f"%{name}%"))
-        ).first()
-        if user:
-            mentioned_users.append(user)
-    
-    return mentioned_users
-
-
-def create_notification(db: Session, user_id: int, ticket_id: int, 
-                       comment_id: int = None, notif_type: str = "MENTION", 
-                       message: str = ""):
-    """Создать уведомление для пользователя"""
-    notification = Notification(
-        user_id=user_id,
-        ticket_id=ticket_id,
-        comment_id=comment_id,
-        type=notif_type,
-        message=message
-    )
-    db.add(notification)
-
-
 def add_history(db: Session, ticket_id: int, user_id: int, action: str, 
                 field_name: str = None, old_value: str = None, new_value: str = None):
     """Добавить запись в историю"""
@@ -80,7 +55,10 @@ def get_comments(
     if not ticket:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
     
-    comments = db.query(Comment).filter(
+    comments = db.query(Comment).options(
+        joinedload(Comment.author),
+        selectinload(Comment.attachments),
+    ).filter(
         Comment.ticket_id == ticket.id
     ).order_by(Comment.created_at.asc()).all()
     
@@ -108,23 +86,20 @@ def create_comment(
     db.flush()  # Чтобы получить ID комментария
     
     # Ищем @упоминания и создаём уведомления
-    mentioned_users = parse_mentions(data.content, db)
-    for mentioned_user in mentioned_users:
-        if mentioned_user.id != current_user.id:  # Не уведомляем самого себя
-            create_notification(
-                db=db,
-                user_id=mentioned_user.id,
-                ticket_id=ticket.id,
-                comment_id=comment.id,
-                notif_type="MENTION",
-                message=f"{current_user.display_name} упомянул вас в комментарии к заявке {ticket.key}"
-            )
+    notify(db, NotificationEvent(
+        "MENTION",
+        f"{current_user.display_name} упомянул вас в комментарии к заявке {ticket.key}",
+        ticket.id,
+        comment.id,
+        current_user.id,
+    ), resolve_mentions(db, data.content) - {current_user.id})  # Не уведомляем самого себя
     
     # Добавляем в историю
     add_history(db, ticket.id, current_user.id, "COMMENT_ADDED", None, None, f"Комментарий добавлен")
     
     db.commit()
     db.refresh(comment)
+    invalidate_ticket(ticket_key)
     
     return comment
 
@@ -146,26 +121,24 @@ def update_comment(
         raise HTTPException(status_code=403, detail="Нет прав на редактирование")
     
     # Проверяем новые упоминания
-    old_mentions = set(u.id for u in parse_mentions(comment.content, db))
-    new_mentions = set(u.id for u in parse_mentions(data.content, db))
+    old_mentions = resolve_mentions(db, comment.content)
+    new_mentions = resolve_mentions(db, data.content)
     
     # Уведомляем только новых упомянутых
     ticket = db.query(Ticket).filter(Ticket.key == ticket_key).first()
-    for user_id in new_mentions - old_mentions:
-        if user_id != current_user.id:
-            create_notification(
-                db=db,
-                user_id=user_id,
-                ticket_id=ticket.id,
-                comment_id=comment.id,
-                notif_type="MENTION",
-                message=f"{current_user.display_name} упомянул вас в комментарии к заявке {ticket.key}"
-            )
+    notify(db, NotificationEvent(
+        "MENTION",
+        f"{current_user.display_name} упомянул вас в комментарии к заявке {ticket.key}",
+        ticket.id,
+        comment.id,
+        current_user.id,
+    ), new_mentions - old_mentions - {current_user.id})
     
     comment.content = data.content
     comment.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(comment)
+    invalidate_ticket(ticket_key)
     
     return comment
 
@@ -185,8 +158,11 @@ def delete_comment(
     if comment.author_id != current_user.id and not current_user.role.is_admin:
         raise HTTPException(status_code=403, detail="Нет прав на удаление")
     
+    # Иначе каскад удалит уведомления вместе со свёрнутыми в них событиями
+    retract_comment_notifications(db, comment.id)
     db.delete(comment)
     db.commit()
+    invalidate_ticket(ticket_key)
     
     return {"message": "Комментарий удалён"}
 
@@ -242,6 +218,7 @@ async def upload_file(
     db.add(attachment)
     db.commit()
     db.refresh(attachment)
+    invalidate_ticket(ticket_key)
     
     return {
         "id": attachment.id,
@@ -291,7 +268,7 @@ def get_history(
     if not ticket:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
     
-    history = db.query(TicketHistory).filter(
+    history = db.query(TicketHistory).options(joinedload(TicketHistory.user)).filter(
         TicketHistory.ticket_id == ticket.id
     ).order_by(TicketHistory.created_at.desc()).all()
     
@@ -319,12 +296,7 @@ def get_unread_count(
     current_user: User = Depends(get_current_user)
 ):
     """Получить количество непрочитанных уведомлений"""
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
-    
-    return {"count": count}
+    return {"count": count_unread(db, current_user.id)}
 
 
 @router.post("/notifications/{notification_id}/read")
@@ -334,13 +306,7 @@ def mark_as_read(
     current_user: User = Depends(get_current_user)
 ):
     """Отметить уведомление как прочитанное"""
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
-    
-    if notification:
-        notification.is_read = True
+    if read_notification(db, current_user.id, notification_id):
         db.commit()
     
     return {"success": True}
@@ -352,10 +318,7 @@ def mark_all_as_read(
     current_user: User = Depends(get_current_user)
 ):
     """Отметить все уведомления как прочитанные"""
-    db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).update({"is_read": True})
+    read_all_notifications(db, current_user.id)
     db.commit()
     
     return {"success": True}
\ No newline at end of file
@@ -0,0 +1,110 @@
+import json
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.database import SessionLocal
+from app.routers.auth import get_current_claims
+from app.services.notification_hub import RESYNC, hub
+from app.services.notifications import count_unread, load_notifications
+from app.services.principals import Principal, load_token_state
+from app.utils.security import create_access_token, decode_token
+
+
+router = APIRouter()
+
+# scope токена потока: get_current_user/get_current_claims такие токены не принимают
+STREAM_SCOPE = "notification_stream"
+
+
+def authenticate(token: str) -> int:
+    """
+    EventSource не умеет заголовки — токен приходит в query. Принимается только
+    короткоживущий токен потока (POST /stream/token), не основной JWT.
+    """
+    payload = decode_token(token)
+    if payload is None or payload.get("scope") != STREAM_SCOPE or payload.get("sub") is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    user_id = int(payload["sub"])
+    db = SessionLocal()
+    try:
+        state = load_token_state(db, user_id)
+    finally:
+        db.close()
+    if state is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    token_version, is_active = state
+    if not is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User deactivated")
+    if payload.get("ver") != token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return user_id
+
+
+def load_batch(user_id: int, ids: list):
+    """Новые уведомления по id и актуальный счётчик — короткая сессия на каждую пачку событий"""
+    db = SessionLocal()
+    try:
+        notifications = load_notifications(db, user_id, ids=ids, limit=len(ids)) if ids else []
+        return notifications, count_unread(db, user_id)
+    finally:
+        db.close()
+
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def event_stream(request: Request, user_id: int):
+    # Подписка до первого подсчёта — события между ними не потеряются. Создаётся
+    # в самом генераторе: если клиент ушёл раньше, чем ответ начался, подписки нет
+    subscription = hub.subscribe(user_id)
+    try:
+        _, count = await run_in_threadpool(load_batch, user_id, [])
+        yield f"retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n" + sse("unread", {"count": count})
+        while not await request.is_disconnected():
+            batch = await subscription.next_batch(settings.NOTIFICATION_STREAM_PING_SECONDS)
+            if batch is None:
+                # Комментарий SSE: держит соединение живым через прокси
+                yield ": ping\n\n"
+                continue
+
+            resync = RESYNC in batch
+            ids = [] if resync else [notification_id for item in batch for notification_id in item]
+            notifications, count = await run_in_threadpool(load_batch, user_id, ids)
+            if resync:
+                yield sse("resync", {})
+            # Старые первыми: клиент добавляет каждое в начало списка
+            for notification in reversed(notifications):
+                yield sse("notification", notification)
+            yield sse("unread", {"count": count})
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.post("/stream/token")
+def create_stream_token(current_user: Principal = Depends(get_current_claims)):
+    """Короткоживущий токен только для подключения к /stream"""
+    ttl = settings.NOTIFICATION_STREAM_TOKEN_TTL_SECONDS
+    token = create_access_token(
+        data={"sub": str(current_user.id), "scope": STREAM_SCOPE, "ver": current_user.token_version},
+        expires_delta=timedelta(seconds=ttl),
+    )
+    return {"token": token, "expires_in": ttl}
+
+
+@router.get("/stream")
+async def notification_stream(request: Request, token: str = Query(...)):
+    """
+    Server-Sent Events: notification — новое уведомление, unread — счётчик
+    непрочитанных, resync — клиент отстал, список нужно перечитать.
+    """
+    user_id = await run_in_threadpool(authenticate, token)
+    return StreamingResponse(
+        event_stream(request, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,17 +1,59 @@
 # backend/app/routers/tickets.py
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
-import re
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
+import io
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_, and_
 
 from app.database import get_db
 from app.models.user import User, Role
 from app.models.ticket import Ticket, TicketStatus
 from app.models.comment import Comment, TicketHistory, Attachment, Notification
-from app.schemas.ticket import TicketCreate, TicketUpdate, TicketStatusUpdate, TicketResponse, TicketList
-from app.routers.auth import get_current_user
+from app.config import settings
+from app.schemas.ticket import (
+    TicketCreate, TicketUpdate, TicketStatusUpdate, TicketResponse, TicketList, TicketPage, TicketSearchHit,
+    TicketBulkUpdate, TicketBulkResult,
+)
+from app.services.pagination import paginate_tickets, count_tickets
+from app.services.projection import parse_fields, project_tickets, rows_to_dicts
+from app.services.export import EXPORT_FORMATS, stream_export
+from app.services.bulk_update import bulk_update_tickets
+from app.services.ticket_keys import allocate_ticket_key
+from app.services.ticket_import import ImportReport, TicketImporter, read_records
+from app.services.fingerprints import (
+    ticket_fingerprint,
+    comments_fingerprint,
+    history_fingerprint,
+    links_fingerprint,
+    list_fingerprint,
+)
+from app.services.reference_data import get_reference_data
+from app.services.response_cache import cached_response, invalidate_ticket
+from app.utils.http_cache import is_not_modified, not_modified_response, set_validators
+from app.utils.serialization import (
+    comment_list_adapter,
+    fast_serialization_enabled,
+    history_list_adapter,
+    serialized_response,
+    ticket_list_adapter,
+    ticket_page_adapter,
+    to_jsonable,
+)
+from app.services.fanout import NotificationEvent, notify, notify_many
+from app.services.mentions import resolve_mentions
+from app.services.notifications import (
+    count_unread,
+    delete_notifications,
+    load_notifications,
+    paginate_notifications,
+    read_all_notifications,
+    read_notification,
+    retract_comment_notifications,
+)
+from app.services.search import apply_search, search_tickets, suggest_tickets
+from app.routers.auth import get_current_user, get_current_claims, require_admin
 from app.utils.logger import log_action
 from app.models.delete_request import DeleteRequest
 from app.models.ticket_link import TicketLink
@@ -24,6 +66,19 @@ router = APIRouter()
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Связи, которые читает сериализация TicketList/TicketResponse — грузим сразу,
+# иначе на каждую строку уходит по три ленивых запроса
+TICKET_LIST_LOAD = (
+    joinedload(Ticket.author),
+    joinedload(Ticket.assignee),
+    joinedload(Ticket.role),
+)
+
+DELETE_REQUEST_LOAD = (
+    joinedload(DeleteRequest.ticket),
+    joinedload(DeleteRequest.requester),
+)
+
 
 def add_history(db: Session, ticket_id: int, user_id: int, action: str, 
                 field_name: str = None, old_value: str = None, new_value: str = None):
@@ -53,12 +108,32 @@ def check_can_create(user: User):
 
 
 def generate_ticket_key(db: Session, role: Role) -> str:
-    """Генерирует ключ заявки: PREFIX-NUMBER"""
-    prefix = role.prefix
-    number = role.next_ticket_number
-    role.next_ticket_number = number + 1
-    db.commit()
-    return f"{prefix}-{number}"
+    """Генерирует ключ заявки: PREFIX-NUMBER (в транзакции вызывающего, без commit)"""
+    return allocate_ticket_key(db, role)
+
+
+def get_ticket_or_404(db: Session, ticket_key: str, *options) -> Ticket:
+    ticket = db.query(Ticket).options(*options).filter(Ticket.key == ticket_key).first()
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Заявка не найдена")
+    return ticket
+
+
+def linked_ticket_keys(db: Session, *ticket_ids: int) -> List[str]:
+    """Ключи заявок, связанных с данными (в любом направлении), одним запросом"""
+    return [key for (key,) in db.query(Ticket.key).join(
+        TicketLink,
+        or_(
+            and_(TicketLink.source_ticket_id.in_(ticket_ids), TicketLink.target_ticket_id == Ticket.id),
+            and_(TicketLink.target_ticket_id.in_(ticket_ids), TicketLink.source_ticket_id == Ticket.id),
+        )
+    ).distinct().all()]
+
+
+def invalidate_ticket_cache(db: Session, ticket: Ticket):
+    """Сбросить кэш заявки и раздел связей у связанных заявок (там виден её статус)"""
+    invalidate_ticket(ticket.key)
+    invalidate_ticket(*linked_ticket_keys(db, ticket.id), sections=("links",))
 
 
 def get_user_display(db: Session, user_id: int) -> str:
@@ -72,53 +147,136 @@ def get_user_display(db: Session, user_id: int) -> str:
 def create_notification(db: Session, user_id: int, ticket_id: int, 
                         notif_type: str, message: str, comment_id: int = None):
     """Создать уведомление"""
-    notification = Notification(
-        user_id=user_id,
-        ticket_id=ticket_id,
-        comment_id=comment_id,
-        type=notif_type,
-        message=message,
-        is_read=False
-    )
-    db.add(notification)
+    notify(db, NotificationEvent(notif_type, message, ticket_id, comment_id), [user_id])
 
 
-# ============ УВЕДОМЛЕНИЯ ============
+def load_ticket_links(db: Session, ticket_id: int) -> list:
+    """Связи заявки: исходящие, затем входящие (тип инвертирован)"""
+    # Связи где текущая заявка — источник
+    outgoing = db.query(TicketLink).options(
+        joinedload(TicketLink.target_ticket),
+        joinedload(TicketLink.creator),
+    ).filter(TicketLink.source_ticket_id == ticket_id).all()
+    # Связи где текущая заявка — цель
+    incoming = db.query(TicketLink).options(
+        joinedload(TicketLink.source_ticket),
+        joinedload(TicketLink.creator),
+    ).filter(TicketLink.target_ticket_id == ticket_id).all()
+    
+    links = []
+    
+    for link in outgoing:
+        links.append({
+            "id": link.id,
+            "type": link.link_type,
+            "direction": "outgoing",
+            "ticket": {
+                "id": link.target_ticket_id,
+                "key": link.target_ticket.key,
+                "title": link.target_ticket.title,
+                "status": link.target_ticket.status
+            },
+            "created_by": link.creator.display_name if link.creator else None,
+            "created_at": link.created_at.isoformat() if link.created_at else None
+        })
+    
+    for link in incoming:
+        # Инвертируем тип для входящих связей
+        inverted_type = {
+            "blocks": "blocked_by",
+            "blocked_by": "blocks",
+            "parent": "child",
+            "child": "parent",
+            "duplicates": "duplicated_by",
+            "duplicated_by": "duplicates",
+        }.get(link.link_type, link.link_type)
+        
+        links.append({
+            "id": link.id,
+            "type": inverted_type,
+            "direction": "incoming",
+            "ticket": {
+                "id": link.source_ticket_id,
+                "key": link.source_ticket.key,
+                "title": link.source_ticket.title,
+                "status": link.source_ticket.status
+            },
+            "created_by": link.creator.display_name if link.creator else None,
+            "created_at": link.created_at.isoformat() if link.created_at else None
+        })
+    
+    return links
 
-@router.get("/notifications", response_model=List[dict])
-def get_notifications(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Получить уведомления текущего пользователя"""
-    notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id
-    ).order_by(Notification.created_at.desc()).limit(50).all()
+
+def load_ticket_comments(db: Session, ticket_id: int) -> list:
+    """Комментарии заявки с авторами (один запрос)"""
+    comments = db.query(Comment).options(joinedload(Comment.author)).filter(
+        Comment.ticket_id == ticket_id
+    ).order_by(Comment.created_at.asc()).all()
+    
+    return to_jsonable(comment_list_adapter, comments)
+
+
+def load_ticket_history(db: Session, ticket_id: int) -> list:
+    """История заявки с пользователями (один запрос)"""
+    history = db.query(TicketHistory).options(joinedload(TicketHistory.user)).filter(
+        TicketHistory.ticket_id == ticket_id
+    ).order_by(TicketHistory.created_at.desc()).all()
+    
+    return to_jsonable(history_list_adapter, history)
+
+
+def load_ticket_attachments(db: Session, ticket_id: int) -> list:
+    """Вложения заявки (один запрос)"""
+    attachments = db.query(Attachment).filter(Attachment.ticket_id == ticket_id).all()
     
     return [
         {
-            "id": n.id,
-            "type": n.type,
-            "message": n.message,
-            "ticket_id": n.ticket_id,
-            "is_read": n.is_read,
-            "created_at": n.created_at.isoformat() if n.created_at else None
+            "id": a.id,
+            "filename": a.filename,
+            "url": f"/uploads/{os.path.basename(a.filepath)}",
+            "mime_type": a.mime_type,
+            "size": a.file_size,
+            "created_at": a.created_at.isoformat() if a.created_at else None
         }
-        for n in notifications
+        for a in attachments
     ]
 
 
+TICKET_DETAIL_LOADERS = {
+    "comments": load_ticket_comments,
+    "history": load_ticket_history,
+    "links": load_ticket_links,
+    "attachments": load_ticket_attachments,
+}
+
+
+# ============ УВЕДОМЛЕНИЯ ============
+
+@router.get("/notifications", response_model=Union[dict, List[dict]])
+def get_notifications(
+    limit: Optional[int] = Query(None, ge=1, le=settings.NOTIFICATION_PAGE_MAX_LIMIT),
+    before: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_claims)
+):
+    """
+    Получить уведомления текущего пользователя (с ключом и названием заявки).
+    С limit/before — страница {items, next_cursor}; без них — последние 50 списком.
+    """
+    if limit is None and before is None:
+        return load_notifications(db, current_user.id)
+    items, next_cursor = paginate_notifications(db, current_user.id, limit or 50, before)
+    return {"items": items, "next_cursor": next_cursor}
+
+
 @router.get("/notifications/unread/count")
 def get_unread_count(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims)
 ):
     """Количество непрочитанных уведомлений"""
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
-    return {"count": count}
+    return {"count": count_unread(db, current_user.id)}
 
 
 @router.post("/notifications/{notification_id}/read")
@@ -128,13 +286,7 @@ def mark_notification_read(
     current_user: User = Depends(get_current_user)
 ):
     """Пометить уведомление как прочитанное"""
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
-    
-    if notification:
-        notification.is_read = True
+    if read_notification(db, current_user.id, notification_id):
         db.commit()
     
     return {"status": "ok"}
@@ -146,37 +298,66 @@ def mark_all_read(
     current_user: User = Depends(get_current_user)
 ):
     """Пометить все уведомления как прочитанные"""
-    db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).update({"is_read": True})
+    read_all_notifications(db, current_user.id)
     db.commit()
     return {"status": "ok"}
 
 
+@router.get("/by-id/{ticket_id}", response_model=TicketResponse)
+def get_ticket_by_id(
+    ticket_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_claims)
+):
+    """Получить заявку по ID (переход из уведомления)"""
+    ticket = db.query(Ticket).options(*TICKET_LIST_LOAD).filter(Ticket.id == ticket_id).first()
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Заявка не найдена")
+    return ticket
+
+
 # ============ РОЛИ И ПОЛЬЗОВАТЕЛИ ============
 
 @router.get("/roles")
 def get_available_roles(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims)
 ):
     """Получить доступные роли для создания заявок"""
     # Читатели не могут создавать заявки
-    if current_user.role.name == "reader":
+    is_reader = current_user.role.name == "reader"
+    
+    snapshot = get_reference_data(db)
+    etag = snapshot.etag("ticket-roles", is_reader)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    set_validators(response, etag)
+    
+    if is_reader:
         return []
     
     # Все остальные видят все роли с prefix
-    roles = db.query(Role).filter(Role.prefix != None).all()
-    return [{"id": r.id, "name": r.name, "prefix": r.prefix, "display_name": r.display_name} for r in roles]
+    return [
+        {"id": r["id"], "name": r["name"], "prefix": r["prefix"], "display_name": r["display_name"]}
+        for r in snapshot.roles if r["prefix"] is not None
+    ]
 
 @router.get("/users")
 def get_users_for_assign(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims)
 ):
-    users = db.query(User).filter(User.is_active == True).all()
-    return [{"id": u.id, "login": u.login, "display_name": u.display_name} for u in users]
+    """Активные пользователи для назначения исполнителем"""
+    snapshot = get_reference_data(db)
+    etag = snapshot.etag("assignable-users")
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    set_validators(response, etag)
+    return snapshot.users
 
 
 
@@ -185,15 +366,15 @@ def get_users_for_assign(
 @router.get("/delete-requests")
 def get_delete_requests(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims)
 ):
     """Получить запросы на удаление (для автора и админов)"""
     if current_user.role.is_admin:
-        requests = db.query(DeleteRequest).filter(
+        requests = db.query(DeleteRequest).options(*DELETE_REQUEST_LOAD).filter(
             DeleteRequest.status == "pending"
         ).all()
     else:
-        requests = db.query(DeleteRequest).join(Ticket).filter(
+        requests = db.query(DeleteRequest).join(Ticket).options(*DELETE_REQUEST_LOAD).filter(
             Ticket.author_id == current_user.id,
             DeleteRequest.status == "pending"
         ).all()
@@ -235,15 +416,19 @@ def approve_delete_request(
     
     ticket_key = ticket.key
     requester_id = delete_req.requested_by
+    linked_keys = linked_ticket_keys(db, ticket.id)
     
     # Удаляем заявку
+    # Уведомления — первыми: иначе каскад от комментариев удалит их мимо счётчиков
+    delete_notifications(db, Notification.ticket_id == ticket.id)
     db.query(Comment).filter(Comment.ticket_id == ticket.id).delete()
     db.query(TicketHistory).filter(TicketHistory.ticket_id == ticket.id).delete()
     db.query(Attachment).filter(Attachment.ticket_id == ticket.id).delete()
-    db.query(Notification).filter(Notification.ticket_id == ticket.id).delete()
     db.query(DeleteRequest).filter(DeleteRequest.ticket_id == ticket.id).delete()
     db.delete(ticket)
     db.commit()
+    invalidate_ticket(ticket_key)
+    invalidate_ticket(*linked_keys, sections=("links",))
     
     # Уведомляем запросившего
     create_notification(
@@ -291,62 +476,26 @@ def reject_delete_request(
 @router.get("/{ticket_key}/links")
 def get_ticket_links(
     ticket_key: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims)
 ):
     """Получить связи заявки"""
-    ticket = db.query(Ticket).filter(Ticket.key == ticket_key).first()
-    if not ticket:
+    fingerprint = links_fingerprint(db, ticket_key)
+    if fingerprint is None:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
+    if is_not_modified(request, *fingerprint):
+        return not_modified_response(*fingerprint)
+    set_validators(response, *fingerprint)
     
-    # Связи где текущая заявка — источник
-    outgoing = db.query(TicketLink).filter(TicketLink.source_ticket_id == ticket.id).all()
-    # Связи где текущая заявка — цель
-    incoming = db.query(TicketLink).filter(TicketLink.target_ticket_id == ticket.id).all()
-    
-    links = []
-    
-    for link in outgoing:
-        links.append({
-            "id": link.id,
-            "type": link.link_type,
-            "direction": "outgoing",
-            "ticket": {
-                "id": link.target_ticket.id,
-                "key": link.target_ticket.key,
-                "title": link.target_ticket.title,
-                "status": link.target_ticket.status
-            },
-            "created_by": link.creator.display_name if link.creator else None,
-            "created_at": link.created_at.isoformat() if link.created_at else None
-        })
-    
-    for link in incoming:
-        # Инвертируем тип для входящих связей
-        inverted_type = {
-            "blocks": "blocked_by",
-            "blocked_by": "blocks",
-            "parent": "child",
-            "child": "parent",
-            "duplicates": "duplicated_by",
-            "duplicated_by": "duplicates",
-        }.get(link.link_type, link.link_type)
-        
-        links.append({
-            "id": link.id,
-            "type": inverted_type,
-            "direction": "incoming",
-            "ticket": {
-                "id": link.source_ticket.id,
-                "key": link.source_ticket.key,
-                "title": link.source_ticket.title,
-                "status": link.source_ticket.status
-            },
-            "created_by": link.creator.display_name if link.creator else None,
-            "created_at": link.created_at.isoformat() if link.created_at else None
-        })
-    
-    return links
+    data = cached_response(
+        "links", ticket_key, current_user, fingerprint[0],
+        lambda: load_ticket_links(db, get_ticket_or_404(db, ticket_key).id)
+    )
+    if fast_serialization_enabled():
+        return direct_response(data, fingerprint)
+    return data
 
 
 @router.post("/{ticket_key}/links")
@@ -394,6 +543,7 @@ def create_ticket_link(
                "Связь", None, f"{link_type} → {target_key}")
     
     db.commit()
+    invalidate_ticket(source_ticket.key, target_ticket.key)
     db.refresh(link)
     
     return {
@@ -437,18 +587,94 @@ def delete_ticket_link(
     
     db.delete(link)
     db.commit()
+    invalidate_ticket(ticket_key, target_key)
     
     return {"status": "ok"}
 
 # ============ ЗАЯВКИ ============
 
-@router.get("/my", response_model=List[TicketList])
+def direct_response(content, fingerprint, adapter=None) -> Response:
+    """Ответ в обход response_model (fields= или быстрая сериализация) — заголовки ставим сами"""
+    response = serialized_response(content, adapter)
+    if fingerprint is not None:
+        set_validators(response, *fingerprint)
+    return response
+
+
+def ticket_list_response(
+    request: Request,
+    response: Response,
+    db: Session,
+    query,
+    limit: Optional[int],
+    cursor: Optional[str],
+    count: Optional[str],
+    fields: Optional[str] = None,
+):
+    """Без limit/cursor — весь список (как раньше), иначе страница с курсором.
+    
+    fields= — выбрать только указанные колонки: строки отдаются как есть,
+    без ORM-объектов и валидации через TicketList.
+    """
+    projection = parse_fields(fields)
+    paginated = limit is not None or cursor is not None
+    
+    filtered = query
+    if projection:
+        query = project_tickets(query, projection)
+    else:
+        query = query.options(*TICKET_LIST_LOAD)
+    
+    if not paginated:
+        items = query.order_by(Ticket.created_at.desc()).all()
+        fingerprint = list_fingerprint(items, fields)
+    else:
+        limit = limit or settings.TICKETS_PAGE_MAX_LIMIT
+        items, next_cursor = paginate_tickets(query, limit, cursor)
+        fingerprint = list_fingerprint(items, limit, cursor, next_cursor, count, fields)
+    
+    if is_not_modified(request, *fingerprint):
+        return not_modified_response(*fingerprint)
+    set_validators(response, *fingerprint)
+    
+    if not paginated:
+        if projection:
+            return direct_response(rows_to_dicts(items, projection), fingerprint)
+        if fast_serialization_enabled():
+            return direct_response(items, fingerprint, ticket_list_adapter)
+        return items
+    
+    total, total_is_estimate = (None, False)
+    if count:
+        total, total_is_estimate = count_tickets(db, filtered, count)
+    page = {
+        "items": items,
+        "next_cursor": next_cursor,
+        "limit": limit,
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+    }
+    if projection:
+        page["items"] = rows_to_dicts(items, projection)
+        return direct_response(page, fingerprint)
+    if fast_serialization_enabled():
+        return direct_response(page, fingerprint, ticket_page_adapter)
+    return page
+
+
+@router.get("/my", response_model=Union[TicketPage, List[TicketList]])
 def get_my_tickets(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims),
+    limit: Optional[int] = Query(None, ge=1, le=settings.TICKETS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    count: Optional[str] = Query(None, pattern="^(exact|estimate)$"),
+    fields: Optional[str] = Query(None, description="Список полей через запятую: key,title,status")
 ):
     """Получить заявки текущего пользователя"""
-    tickets = db.query(Ticket).filter(
+    query = db.query(Ticket).filter(
         and_(
             Ticket.assignee_id == current_user.id,
             Ticket.status.in_([
@@ -457,24 +683,22 @@ def get_my_tickets(
                 TicketStatus.WAITING.value  # Добавляем ожидание
             ])
         )
-    ).order_by(Ticket.created_at.desc()).all()
-    return tickets
-
-@router.get("", response_model=List[TicketList])
-def get_all_tickets(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    search: Optional[str] = Query(None),
-    status: Optional[str] = Query(None),
-    priority: Optional[str] = Query(None),
-    assignee_id: Optional[int] = Query(None),
-    role_id: Optional[int] = Query(None)
+    )
+    return ticket_list_response(request, response, db, query, limit, cursor, count, fields)
+
+def filter_tickets(
+    db: Session,
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assignee_id: Optional[int] = None,
+    role_id: Optional[int] = None,
 ):
+    """Запрос заявок с фильтрами списка (общий для списка и экспорта)"""
     query = db.query(Ticket)
     
     if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(or_(Ticket.key.ilike(search_pattern), Ticket.title.ilike(search_pattern)))
+        query = apply_search(db, query, search)
     if status:
         query = query.filter(Ticket.status == status)
     if priority:
@@ -484,7 +708,138 @@ def get_all_tickets(
     if role_id:
         query = query.filter(Ticket.role_id == role_id)
     
-    return query.order_by(Ticket.created_at.desc()).all()
+    return query
+
+
+@router.get("", response_model=Union[TicketPage, List[TicketList]])
+def get_all_tickets(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_claims),
+    search: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    assignee_id: Optional[int] = Query(None),
+    role_id: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=settings.TICKETS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    count: Optional[str] = Query(None, pattern="^(exact|estimate)$"),
+    fields: Optional[str] = Query(None, description="Список полей через запятую: key,title,status")
+):
+    query = filter_tickets(db, search, status, priority, assignee_id, role_id)
+    return ticket_list_response(request, response, db, query, limit, cursor, count, fields)
+
+
+@router.get("/export")
+def export_tickets(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(get_current_claims),
+    search: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    assignee_id: Optional[int] = Query(None),
+    role_id: Optional[int] = Query(None)
+):
+    """Выгрузка заявок в CSV/NDJSON потоком (фильтры — как у списка)"""
+    filename = f"tickets-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    log_action(current_user.id, "TICKETS_EXPORTED", {"format": format})
+    return StreamingResponse(
+        stream_export(
+            lambda db: filter_tickets(db, search, status, priority, assignee_id, role_id),
+            format,
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/search", response_model=List[TicketSearchHit])
+def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=settings.SEARCH_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_claims)
+):
+    """Полнотекстовый поиск по ключу, названию и описанию (с ранжированием)"""
+    hits = search_tickets(db, q, limit, TICKET_LIST_LOAD)
+    return [
+        {**TicketList.model_validate(ticket).model_dump(), "rank": rank, "snippet": snippet}
+        for ticket, rank, snippet in hits
+    ]
+
+
+@router.get("/suggest")
+def suggest(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=settings.SUGGEST_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_claims)
+):
+    """Автодополнение ключей и названий заявок: [{key, title, status}]"""
+    response.headers["Cache-Control"] = f"private, max-age={settings.SUGGEST_CACHE_TTL_SECONDS}"
+    return suggest_tickets(db, q, limit)
+
+
+@router.post("/bulk", response_model=List[TicketBulkResult])
+def bulk_update(
+    data: TicketBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Массовое изменение заявок (исполнитель, приоритет, статус, срок) одной транзакцией"""
+    check_can_edit(current_user)
+
+    changes = {
+        field: getattr(value, "value", value)
+        for field, value in data.changes.model_dump(exclude_unset=True).items()
+    }
+    if not changes:
+        raise HTTPException(status_code=400, detail="Не указаны изменения")
+    if changes.get("assignee_id") and not db.query(User.id).filter(User.id == changes["assignee_id"]).first():
+        raise HTTPException(status_code=400, detail="Исполнитель не найден")
+
+    results, updated_ids = bulk_update_tickets(db, data.keys, changes, current_user)
+
+    updated_keys = [item["key"] for item in results if item["result"] == "updated"]
+    if updated_keys:
+        invalidate_ticket(*updated_keys)
+        invalidate_ticket(*linked_ticket_keys(db, *updated_ids), sections=("links",))
+
+    log_action(current_user.id, "TICKETS_BULK_UPDATED", {
+        "changes": list(changes), "requested": len(data.keys), "updated": len(updated_keys)
+    })
+    return results
+
+
+@router.post("/import")
+def import_tickets(
+    file: UploadFile = File(...),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    role_id: Optional[int] = Query(None),
+    start_after: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """
+    Импорт заявок из CSV/NDJSON (поля как у создания заявки) пачками.
+    В ответе line — номер последней обработанной записи: при обрыве
+    повторная загрузка с start_after=line продолжит с того же места.
+    Если пачка не записалась, ответ 500 содержит тот же отчёт с aborted.
+    """
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    importer = TicketImporter(db, admin, default_role_id=role_id)
+    report = importer.run(read_records(stream, format), ImportReport(line=start_after))
+
+    log_action(admin.id, "TICKETS_IMPORTED", {
+        "format": format, "line": report.line, "created": report.created, "failed": report.failed,
+        "aborted": report.aborted,
+    })
+    if report.aborted:
+        # Предыдущие пачки уже закоммичены — клиенту нужен line, чтобы продолжить
+        return JSONResponse(status_code=500, content={**report.to_dict(), "detail": report.aborted})
+    return report.to_dict()
 
 
 @router.post("", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
@@ -505,8 +860,9 @@ def create_ticket(
     else:
         if not current_user.role.prefix:
             raise HTTPException(status_code=400, detail="Укажите роль для заявки")
-        role = current_user.role
+        role = db.query(Role).filter(Role.id == current_user.role_id).first()
     
+    # Номер выделяется атомарно, блокировка префикса — до единственного commit ниже
     key = generate_ticket_key(db, role)
     
     ticket = Ticket(
@@ -523,8 +879,7 @@ def create_ticket(
     )
     
     db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
+    db.flush()
     
     add_history(db, ticket.id, current_user.id, "CREATED", None, None, f"Заявка {key} создана")
     
@@ -536,21 +891,59 @@ def create_ticket(
         )
     
     db.commit()
+    db.refresh(ticket)
     
     log_action(current_user.id, "TICKET_CREATED", {"key": key, "title": ticket_data.title})
     return ticket
 
 
+@router.get("/{ticket_key}/full")
+def get_ticket_full(
+    ticket_key: str,
+    include: str = Query(",".join(TICKET_DETAIL_LOADERS), description="comments,history,links,attachments"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_claims)
+):
+    """Заявка со всеми вложенными данными за один запрос к API"""
+    sections = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = [name for name in sections if name not in TICKET_DETAIL_LOADERS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные разделы: {', '.join(unknown)}")
+    
+    ticket = db.query(Ticket).options(*TICKET_LIST_LOAD).filter(Ticket.key == ticket_key).first()
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Заявка не найдена")
+    
+    result = {"ticket": TicketResponse.model_validate(ticket).model_dump(mode="json")}
+    for name in dict.fromkeys(sections):
+        result[name] = TICKET_DETAIL_LOADERS[name](db, ticket.id)
+    return result
+
+
 @router.get("/{ticket_key}", response_model=TicketResponse)
 def get_ticket(
     ticket_key: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims)
 ):
-    ticket = db.query(Ticket).filter(Ticket.key == ticket_key).first()
-    if not ticket:
+    fingerprint = ticket_fingerprint(db, ticket_key)
+    if fingerprint is None:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
-    return ticket
+    if is_not_modified(request, *fingerprint):
+        return not_modified_response(*fingerprint)
+    set_validators(response, *fingerprint)
+    
+    data = cached_response(
+        "ticket", ticket_key, current_user, fingerprint[0],
+        lambda: TicketResponse.model_validate(
+            get_ticket_or_404(db, ticket_key, *TICKET_LIST_LOAD)
+        ).model_dump(mode="json")
+    )
+    if fast_serialization_enabled():
+        return direct_response(data, fingerprint)
+    return data
 
 
 @router.patch("/{ticket_key}", response_model=TicketResponse)
@@ -602,6 +995,7 @@ def update_ticket(
         setattr(ticket, field, new_value)
     
     db.commit()
+    invalidate_ticket_cache(db, ticket)
     db.refresh(ticket)
     
     log_action(current_user.id, "TICKET_UPDATED", {"key": ticket_key})
@@ -643,26 +1037,22 @@ def request_delete_ticket(
     )
     db.add(delete_request)
     
-    # Уведомляем автора
-    if ticket.author_id != current_user.id:
-        create_notification(
-            db, ticket.author_id, ticket.id, "DELETE_REQUEST",
-            f"{current_user.display_name} запросил удаление заявки {ticket.key}"
-        )
-    
-    # Уведомляем всех админов
-    admins = db.query(User).join(Role).filter(Role.is_admin == True).all()
-    for admin in admins:
-        if admin.id != current_user.id and admin.id != ticket.author_id:
-            create_notification(
-                db, admin.id, ticket.id, "DELETE_REQUEST",
-                f"{current_user.display_name} запросил удаление заявки {ticket.key}"
-            )
+    # Уведомляем автора и всех админов — одной рассылкой
+    recipients = {ticket.author_id}
+    recipients.update(admin_id for (admin_id,) in db.query(User.id).join(Role).filter(Role.is_admin == True))
+    recipients.discard(current_user.id)
+    notify(db, NotificationEvent(
+        "DELETE_REQUEST",
+        f"{current_user.display_name} запросил удаление заявки {ticket.key}",
+        ticket.id,
+        actor_id=current_user.id,
+    ), recipients)
     
     add_history(db, ticket.id, current_user.id, "DELETE_REQUESTED", 
                None, None, f"{current_user.display_name} запросил удаление")
     
     db.commit()
+    invalidate_ticket(ticket.key)
     
     log_action(current_user.id, "TICKET_DELETE_REQUESTED", {"key": ticket_key})
     return {
@@ -685,15 +1075,20 @@ def delete_ticket(
     if ticket.author_id != current_user.id and not current_user.role.is_admin:
         raise HTTPException(status_code=403, detail="Нет прав на удаление заявки")
     
+    linked_keys = linked_ticket_keys(db, ticket.id)
+    
     # Удаляем связанные данные
+    # Уведомления — первыми: иначе каскад от комментариев удалит их мимо счётчиков
+    delete_notifications(db, Notification.ticket_id == ticket.id)
     db.query(Comment).filter(Comment.ticket_id == ticket.id).delete()
     db.query(TicketHistory).filter(TicketHistory.ticket_id == ticket.id).delete()
     db.query(Attachment).filter(Attachment.ticket_id == ticket.id).delete()
-    db.query(Notification).filter(Notification.ticket_id == ticket.id).delete()
     
     # Удаляем заявку
     db.delete(ticket)
     db.commit()
+    invalidate_ticket(ticket_key)
+    invalidate_ticket(*linked_keys, sections=("links",))
     
     log_action(current_user.id, "TICKET_DELETED", {"key": ticket_key})
     return {"status": "ok", "message": f"Заявка {ticket_key} удалена"}
@@ -729,6 +1124,7 @@ def start_work(
                "Статус", "Открыта", "В работе")
     
     db.commit()
+    invalidate_ticket_cache(db, ticket)
     db.refresh(ticket)
     
     log_action(current_user.id, "TICKET_STARTED", {"key": ticket_key})
@@ -774,6 +1170,7 @@ def resolve_ticket(
         )
     
     db.commit()
+    invalidate_ticket_cache(db, ticket)
     db.refresh(ticket)
     
     log_action(current_user.id, "TICKET_RESOLVED", {"key": ticket_key, "time_spent": ticket.time_spent})
@@ -808,6 +1205,7 @@ def reopen_ticket(
                "Статус", "Выполнен", "В работе (возвращено)")
     
     db.commit()
+    invalidate_ticket_cache(db, ticket)
     db.refresh(ticket)
     
     log_action(current_user.id, "TICKET_REOPENED", {"key": ticket_key})
@@ -846,6 +1244,7 @@ def pause_ticket(
                "Статус", "В работе", "Ожидание")
     
     db.commit()
+    invalidate_ticket_cache(db, ticket)
     db.refresh(ticket)
     
     log_action(current_user.id, "TICKET_PAUSED", {"key": ticket_key, "time_spent": ticket.time_spent})
@@ -879,6 +1278,7 @@ def resume_ticket(
                "Статус", "Ожидание", "В работе")
     
     db.commit()
+    invalidate_ticket_cache(db, ticket)
     db.refresh(ticket)
     
     log_action(current_user.id, "TICKET_RESUMED", {"key": ticket_key})
@@ -889,26 +1289,26 @@ def resume_ticket(
 @router.get("/{ticket_key}/comments")
 def get_comments(
     ticket_key: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims)
 ):
     """Получить комментарии заявки"""
-    ticket = db.query(Ticket).filter(Ticket.key == ticket_key).first()
-    if not ticket:
+    fingerprint = comments_fingerprint(db, ticket_key)
+    if fingerprint is None:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
+    if is_not_modified(request, *fingerprint):
+        return not_modified_response(*fingerprint)
+    set_validators(response, *fingerprint)
     
-    comments = db.query(Comment).filter(Comment.ticket_id == ticket.id).order_by(Comment.created_at.asc()).all()
-    
-    return [
-        {
-            "id": c.id,
-            "content": c.content,
-            "author": {"id": c.author.id, "display_name": c.author.display_name} if c.author else None,
-            "created_at": c.created_at.isoformat() if c.created_at else None,
-            "updated_at": c.updated_at.isoformat() if c.updated_at else None
-        }
-        for c in comments
-    ]
+    data = cached_response(
+        "comments", ticket_key, current_user, fingerprint[0],
+        lambda: load_ticket_comments(db, get_ticket_or_404(db, ticket_key).id)
+    )
+    if fast_serialization_enabled():
+        return direct_response(data, fingerprint)
+    return data
 
 
 @router.post("/{ticket_key}/comments")
@@ -935,22 +1335,8 @@ def add_comment(
     db.add(comment)
     db.flush()  # Получаем ID комментария
     
-    # Парсим @mentions из контента: @[Имя Пользователя]
-    mentions = re.findall(r'@\[([^\]]+)\]', content)
-    mentioned_user_ids = set()
-    
-    for mention_name in mentions:
-        mentioned_user = db.query(User).filter(
-            User.display_name == mention_name
-        ).first()
-        
-        if mentioned_user and mentioned_user.id != current_user.id:
-            mentioned_user_ids.add(mentioned_user.id)
-            create_notification(
-                db, mentioned_user.id, ticket.id, "MENTION",
-                f"{current_user.display_name} упомянул вас в заявке {ticket.key}",
-                comment.id
-            )
+    # @[Имя Пользователя] и @login — через общий индекс упоминаний
+    mentioned_user_ids = resolve_mentions(db, content) - {current_user.id}
     
     # Уведомляем автора и исполнителя о новом комментарии
     notify_users = set()
@@ -962,16 +1348,28 @@ def add_comment(
     # Исключаем тех, кто уже получил mention
     notify_users -= mentioned_user_ids
     
-    for user_id in notify_users:
-        create_notification(
-            db, user_id, ticket.id, "COMMENT",
+    # Оба события — одной пачкой: один multi-row INSERT на комментарий
+    notify_many(db, [
+        (NotificationEvent(
+            "MENTION",
+            f"{current_user.display_name} упомянул вас в заявке {ticket.key}",
+            ticket.id,
+            comment.id,
+            current_user.id,
+        ), mentioned_user_ids),
+        (NotificationEvent(
+            "COMMENT",
             f"{current_user.display_name} добавил комментарий к заявке {ticket.key}",
-            comment.id
-        )
+            ticket.id,
+            comment.id,
+            current_user.id,
+        ), notify_users),
+    ])
     
     add_history(db, ticket.id, current_user.id, "COMMENT_ADDED")
     
     db.commit()
+    invalidate_ticket(ticket.key)
     db.refresh(comment)
     
     return {
@@ -1002,6 +1400,7 @@ def update_comment(
     comment.content = data.get("content", comment.content)
     comment.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_ticket(ticket_key)
     
     return {"status": "ok"}
 
@@ -1021,8 +1420,11 @@ def delete_comment(
     if comment.author_id != current_user.id and not current_user.role.is_admin:
         raise HTTPException(status_code=403, detail="Нет прав на удаление")
     
+    # Иначе каскад удалит уведомления вместе со свёрнутыми в них событиями
+    retract_comment_notifications(db, comment.id)
     db.delete(comment)
     db.commit()
+    invalidate_ticket(ticket_key)
     
     return {"status": "ok"}
 
@@ -1032,30 +1434,26 @@ def delete_comment(
 @router.get("/{ticket_key}/history")
 def get_history(
     ticket_key: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims)
 ):
     """Получить историю заявки"""
-    ticket = db.query(Ticket).filter(Ticket.key == ticket_key).first()
-    if not ticket:
+    fingerprint = history_fingerprint(db, ticket_key)
+    if fingerprint is None:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
+    if is_not_modified(request, *fingerprint):
+        return not_modified_response(*fingerprint)
+    set_validators(response, *fingerprint)
     
-    history = db.query(TicketHistory).filter(
-        TicketHistory.ticket_id == ticket.id
-    ).order_by(TicketHistory.created_at.desc()).all()
-    
-    return [
-        {
-            "id": h.id,
-            "action": h.action,
-            "field_name": h.field_name,
-            "old_value": h.old_value,
-            "new_value": h.new_value,
-            "user": {"id": h.user.id, "display_name": h.user.display_name} if h.user else None,
-            "created_at": h.created_at.isoformat() if h.created_at else None
-        }
-        for h in history
-    ]
+    data = cached_response(
+        "history", ticket_key, current_user, fingerprint[0],
+        lambda: load_ticket_history(db, get_ticket_or_404(db, ticket_key).id)
+    )
+    if fast_serialization_enabled():
+        return direct_response(data, fingerprint)
+    return data
 
 
 # ============ ФАЙЛЫ ============
@@ -1095,6 +1493,7 @@ async def upload_file(
     )
     db.add(attachment)
     db.commit()
+    invalidate_ticket(ticket.key)
     db.refresh(attachment)
     
     return {
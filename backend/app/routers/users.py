@@ -1,12 +1,18 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
 from pydantic import BaseModel
 
 from app.database import get_db
 from app.models.user import User, Role
-from app.routers.auth import get_current_user, require_admin
+from app.routers.auth import get_current_claims, require_admin, require_admin_claims
+from app.services.principals import invalidate_principal, bump_token_version
+from app.services.reference_data import get_reference_data, invalidate_reference_data
+from app.utils.cache import get_cache_stats
+from app.utils.http_cache import is_not_modified, not_modified_response, set_validators
 from app.utils.logger import log_action
+from app.utils.security import hash_password_async
 
 
 router = APIRouter()
@@ -48,12 +54,18 @@ class UserStatusUpdate(BaseModel):
 
 @router.get("/roles", response_model=List[RoleInfo])
 def get_all_roles(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_claims)
 ):
     """Получить список всех ролей"""
-    roles = db.query(Role).all()
-    return roles
+    snapshot = get_reference_data(db)
+    etag = snapshot.etag("roles")
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    set_validators(response, etag)
+    return snapshot.roles
 
 
 # ============ Админские эндпоинты ============
@@ -61,18 +73,24 @@ def get_all_roles(
 @router.get("", response_model=List[UserInfo])
 def get_all_users(
     db: Session = Depends(get_db),
-    admin: User = Depends(require_admin)
+    admin: User = Depends(require_admin_claims)
 ):
     """[ADMIN] Получить список всех пользователей"""
-    users = db.query(User).all()
+    users = db.query(User).options(joinedload(User.role)).all()
     return users
 
 
+@router.get("/stats/cache")
+def get_cache_statistics(admin: User = Depends(require_admin_claims)):
+    """[ADMIN] Статистика внутренних кэшей (hits/misses/evictions)"""
+    return get_cache_stats()
+
+
 @router.get("/{user_id}", response_model=UserInfo)
 def get_user(
     user_id: int,
     db: Session = Depends(get_db),
-    admin: User = Depends(require_admin)
+    admin: User = Depends(require_admin_claims)
 ):
     """[ADMIN] Получить пользователя по ID"""
     user = db.query(User).filter(User.id == user_id).first()
@@ -104,8 +122,11 @@ def update_user_role(
     
     old_role = user.role.name
     user.role_id = role.id
+    bump_token_version(user)
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.id)
+    invalidate_reference_data()
     
     log_action(admin.id, "USER_ROLE_CHANGED", {
         "target_user": user.login,
@@ -134,8 +155,11 @@ def update_user_status(
         raise HTTPException(status_code=404, detail="User not found")
     
     user.is_active = data.is_active
+    bump_token_version(user)
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.id)
+    invalidate_reference_data()
     
     action = "USER_ACTIVATED" if data.is_active else "USER_DEACTIVATED"
     log_action(admin.id, action, {"target_user": user.login})
@@ -162,6 +186,8 @@ def delete_user(
     login = user.login
     db.delete(user)
     db.commit()
+    invalidate_principal(user_id)
+    invalidate_reference_data()
     
     log_action(admin.id, "USER_DELETED", {"deleted_user": login})
     
@@ -177,15 +203,8 @@ class AdminUserCreate(BaseModel):
     role_id: int
 
 
-@router.post("", response_model=UserInfo, status_code=status.HTTP_201_CREATED)
-def create_user_by_admin(
-    data: AdminUserCreate,
-    db: Session = Depends(get_db),
-    admin: User = Depends(require_admin)
-):
-    """[ADMIN] Создать пользователя с любой ролью"""
-    from app.utils.security import hash_password
-    
+def _check_new_user(db: Session, data: AdminUserCreate) -> Role:
+    """Проверить, что логин свободен и роль существует"""
     # Проверяем, что логин не занят
     existing = db.query(User).filter(User.login == data.login).first()
     if existing:
@@ -196,20 +215,36 @@ def create_user_by_admin(
     if not role:
         raise HTTPException(status_code=400, detail="Role not found")
     
-    user = User(
-        login=data.login,
-        password_hash=hash_password(data.password),
-        display_name=data.display_name or data.login,
-        role_id=role.id,
-    )
-    
+    return role
+
+
+def _save_user(db: Session, user: User, admin_id: int, role_name: str) -> UserInfo:
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_reference_data()
     
-    log_action(admin.id, "USER_CREATED_BY_ADMIN", {
-        "new_user": data.login,
-        "role": role.name
+    log_action(admin_id, "USER_CREATED_BY_ADMIN", {
+        "new_user": user.login,
+        "role": role_name
     })
     
-    return user
\ No newline at end of file
+    return UserInfo.model_validate(user)
+
+
+@router.post("", response_model=UserInfo, status_code=status.HTTP_201_CREATED)
+async def create_user_by_admin(
+    data: AdminUserCreate,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """[ADMIN] Создать пользователя с любой ролью (bcrypt — в выделенном пуле, БД — в threadpool)"""
+    role = await run_in_threadpool(_check_new_user, db, data)
+    
+    user = User(
+        login=data.login,
+        password_hash=await hash_password_async(data.password),
+        display_name=data.display_name or data.login,
+        role_id=role.id,
+    )
+    return await run_in_threadpool(_save_user, db, user, admin.id, role.name)
@@ -11,4 +11,9 @@ from app.schemas.ticket import (
     TicketStatusUpdate,
     TicketResponse,
     TicketList,
+    TicketPage,
+    TicketSearchHit,
+    TicketBulkChanges,
+    TicketBulkUpdate,
+    TicketBulkResult,
 )
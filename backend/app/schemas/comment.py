@@ -46,6 +46,26 @@ class CommentResponse(BaseModel):
         from_attributes = True
 
 
+class UserBrief(BaseModel):
+    id: int
+    display_name: Optional[str]
+    
+    class Config:
+        from_attributes = True
+
+
+class CommentItem(BaseModel):
+    """Комментарий в списке заявки (GET /tickets/{key}/comments)"""
+    id: int
+    content: str
+    author: Optional[UserBrief]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
 # ========== История ==========
 
 class HistoryResponse(BaseModel):
@@ -61,6 +81,20 @@ class HistoryResponse(BaseModel):
         from_attributes = True
 
 
+class HistoryItem(BaseModel):
+    """Запись истории заявки (GET /tickets/{key}/history)"""
+    id: int
+    action: str
+    field_name: Optional[str]
+    old_value: Optional[str]
+    new_value: Optional[str]
+    user: Optional[UserBrief]
+    created_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
 # ========== Уведомления ==========
 
 class NotificationResponse(BaseModel):
@@ -70,6 +104,8 @@ class NotificationResponse(BaseModel):
     is_read: bool
     ticket_id: Optional[int]
     created_at: datetime
+    event_count: int = 1
+    last_actor_id: Optional[int] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
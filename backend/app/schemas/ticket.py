@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
+from app.config import settings
 from app.models.ticket import TicketStatus, TicketPriority
 
 
@@ -80,4 +81,38 @@ class TicketList(BaseModel):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class TicketPage(BaseModel):
+    """Страница списка заявок (keyset-пагинация)"""
+    items: List[TicketList]
+    next_cursor: Optional[str] = None
+    limit: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+
+class TicketSearchHit(TicketList):
+    """Результат полнотекстового поиска: заявка + релевантность и фрагмент с подсветкой"""
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
+
+
+class TicketBulkChanges(BaseModel):
+    """Изменения, применяемые ко всем заявкам (передаются только нужные поля)"""
+    assignee_id: Optional[int] = None
+    priority: Optional[TicketPriority] = None
+    status: Optional[TicketStatus] = None
+    deadline: Optional[datetime] = None
+
+
+class TicketBulkUpdate(BaseModel):
+    keys: List[str] = Field(..., min_length=1, max_length=settings.BULK_MAX_KEYS)
+    changes: TicketBulkChanges
+
+
+class TicketBulkResult(BaseModel):
+    key: str
+    result: str  # updated, unchanged, not_found, forbidden, invalid_transition
+    detail: Optional[str] = None
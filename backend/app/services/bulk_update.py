@@ -0,0 +1,190 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.models.comment import TicketHistory
+from app.models.ticket import Ticket, TicketStatus
+from app.models.user import User
+from app.services.fanout import NotificationEvent, notify_many
+
+
+# Размер пачки для IN (...) — чтобы не упереться в лимит параметров драйвера
+LOOKUP_CHUNK_SIZE = 1000
+
+STATUS_LABELS = {
+    TicketStatus.OPEN.value: "Открыта",
+    TicketStatus.IN_PROGRESS.value: "В работе",
+    TicketStatus.WAITING.value: "Ожидание",
+    TicketStatus.DONE.value: "Выполнен",
+    TicketStatus.CLOSED.value: "Закрыта",
+}
+
+# Переходы, которые разрешают start/resolve/reopen/pause/resume, -> подпись нового статуса в истории
+STATUS_TRANSITIONS = {
+    (TicketStatus.OPEN.value, TicketStatus.IN_PROGRESS.value): "В работе",
+    (TicketStatus.IN_PROGRESS.value, TicketStatus.DONE.value): "Выполнен",
+    (TicketStatus.DONE.value, TicketStatus.IN_PROGRESS.value): "В работе (возвращено)",
+    (TicketStatus.IN_PROGRESS.value, TicketStatus.WAITING.value): "Ожидание",
+    (TicketStatus.WAITING.value, TicketStatus.IN_PROGRESS.value): "В работе",
+}
+
+TICKET_COLUMNS = (
+    Ticket.id,
+    Ticket.key,
+    Ticket.title,
+    Ticket.status,
+    Ticket.priority,
+    Ticket.author_id,
+    Ticket.assignee_id,
+    Ticket.deadline,
+    Ticket.time_spent,
+    Ticket.timer_started_at,
+)
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _load_tickets(db: Session, keys: List[str]) -> Dict[str, tuple]:
+    rows = {}
+    for chunk in _chunks(keys, LOOKUP_CHUNK_SIZE):
+        for row in db.query(*TICKET_COLUMNS).filter(Ticket.key.in_(chunk)).all():
+            rows[row.key] = row
+    return rows
+
+
+def _user_names(db: Session, user_ids: set) -> Dict[int, str]:
+    user_ids = [user_id for user_id in user_ids if user_id]
+    if not user_ids:
+        return {}
+    return dict(db.query(User.id, User.display_name).filter(User.id.in_(user_ids)).all())
+
+
+def _status_update(row, new_status: str, now: datetime) -> dict:
+    """Поля таймера при смене статуса — те же правила, что у start/pause/resume/resolve/reopen"""
+    values = {"status": new_status}
+    timer_running = row.status == TicketStatus.IN_PROGRESS.value and row.timer_started_at
+
+    if new_status == TicketStatus.IN_PROGRESS.value:
+        if row.status == TicketStatus.OPEN.value:
+            values["time_spent"] = 0
+        values["timer_started_at"] = now
+    elif timer_running:
+        elapsed = (now - row.timer_started_at).total_seconds()
+        values["time_spent"] = (row.time_spent or 0) + int(elapsed)
+        values["timer_started_at"] = None
+
+    if new_status == TicketStatus.DONE.value:
+        values["resolved_at"] = now
+    elif row.status == TicketStatus.DONE.value:
+        values["resolved_at"] = None
+    return values
+
+
+def bulk_update_tickets(db: Session, keys: List[str], changes: dict, user: User) -> Tuple[List[dict], List[int]]:
+    """
+    Применить один набор изменений к списку заявок в одной транзакции.
+    Заявки читаются одним запросом, история и уведомления пишутся multi-row INSERT.
+    Смена статуса допускается только там, где её разрешил бы одиночный обработчик
+    (STATUS_TRANSITIONS), иначе заявка получает результат invalid_transition.
+    Возвращает (результаты по ключам, id изменённых заявок).
+    """
+    keys = list(dict.fromkeys(keys))
+    tickets = _load_tickets(db, keys)
+    now = datetime.utcnow()
+
+    names = {}
+    if "assignee_id" in changes:
+        names = _user_names(db, {row.assignee_id for row in tickets.values()} | {changes["assignee_id"]})
+
+    def display(user_id):
+        if not user_id:
+            return "Не назначен"
+        return names.get(user_id, "Неизвестный")
+
+    updates, history, notifications, results, updated_ids = [], [], [], [], []
+
+    for key in keys:
+        row = tickets.get(key)
+        if row is None:
+            results.append({"key": key, "result": "not_found", "detail": "Заявка не найдена"})
+            continue
+
+        new_status = changes.get("status")
+        if new_status is not None and new_status != row.status:
+            if row.assignee_id != user.id and not user.role.is_admin:
+                results.append({"key": key, "result": "forbidden", "detail": "Вы не являетесь исполнителем"})
+                continue
+            if (row.status, new_status) not in STATUS_TRANSITIONS:
+                results.append({
+                    "key": key,
+                    "result": "invalid_transition",
+                    "detail": f"Нельзя перевести заявку из статуса «{STATUS_LABELS.get(row.status, row.status)}» "
+                              f"в «{STATUS_LABELS.get(new_status, new_status)}»",
+                })
+                continue
+
+        values = {}
+        entries = []
+
+        if "assignee_id" in changes and changes["assignee_id"] != row.assignee_id:
+            new_assignee = changes["assignee_id"]
+            values["assignee_id"] = new_assignee
+            entries.append(("ASSIGNEE_CHANGED", "Исполнитель", display(row.assignee_id), display(new_assignee)))
+            if new_assignee and new_assignee != user.id:
+                notifications.append((NotificationEvent(
+                    "ASSIGNED", f"Вам назначена заявка {row.key}: {row.title}", row.id, actor_id=user.id,
+                ), [new_assignee]))
+
+        if "priority" in changes and changes["priority"] != row.priority:
+            values["priority"] = changes["priority"]
+            entries.append(("PRIORITY_CHANGED", "Приоритет", str(row.priority), str(changes["priority"])))
+
+        if "deadline" in changes and changes["deadline"] != row.deadline:
+            values["deadline"] = changes["deadline"]
+
+        if new_status is not None and new_status != row.status:
+            values.update(_status_update(row, new_status, now))
+            entries.append((
+                "STATUS_CHANGED", "Статус",
+                STATUS_LABELS.get(row.status, row.status), STATUS_TRANSITIONS[(row.status, new_status)],
+            ))
+            if new_status == TicketStatus.DONE.value and row.author_id and row.author_id != user.id:
+                notifications.append((NotificationEvent(
+                    "STATUS_CHANGED", f"Заявка {row.key} выполнена", row.id, actor_id=user.id,
+                ), [row.author_id]))
+
+        if not values:
+            results.append({"key": key, "result": "unchanged", "detail": None})
+            continue
+
+        values.update(id=row.id, updated_at=now)
+        updates.append(values)
+        history.extend(
+            {
+                "ticket_id": row.id,
+                "user_id": user.id,
+                "action": action,
+                "field_name": field_name,
+                "old_value": old_value,
+                "new_value": new_value,
+                "created_at": now,
+            }
+            for action, field_name, old_value, new_value in entries
+        )
+        updated_ids.append(row.id)
+        results.append({"key": key, "result": "updated", "detail": None})
+
+    # UPDATE по первичному ключу (executemany), INSERT — одной пачкой на таблицу
+    if updates:
+        db.execute(update(Ticket), updates)
+    if history:
+        db.execute(insert(TicketHistory), history)
+    notify_many(db, notifications)
+    db.commit()
+
+    return results, updated_ids
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+from typing import Callable, Iterator
+
+from sqlalchemy.orm import Query, Session, aliased
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.ticket import Ticket
+from app.models.user import User, Role
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = (
+    "key", "title", "status", "priority", "author", "assignee", "role",
+    "deadline", "time_spent", "created_at", "updated_at", "resolved_at",
+)
+
+
+def export_query(query: Query) -> Query:
+    """Колонки экспорта: имена автора, исполнителя и роли — через join, без ленивых загрузок"""
+    author = aliased(User)
+    assignee = aliased(User)
+    role = aliased(Role)
+    return query.outerjoin(author, author.id == Ticket.author_id).outerjoin(
+        assignee, assignee.id == Ticket.assignee_id
+    ).outerjoin(role, role.id == Ticket.role_id).with_entities(
+        Ticket.key,
+        Ticket.title,
+        Ticket.status,
+        Ticket.priority,
+        author.display_name.label("author"),
+        assignee.display_name.label("assignee"),
+        role.display_name.label("role"),
+        Ticket.deadline,
+        Ticket.time_spent,
+        Ticket.created_at,
+        Ticket.updated_at,
+        Ticket.resolved_at,
+    ).order_by(Ticket.created_at.desc(), Ticket.id.desc())
+
+
+def _json_default(value):
+    # Даты — ISO 8601, как в CSV
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunks(rows) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM — чтобы Excel открыл кириллицу в UTF-8
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_COLUMNS)
+    for index, row in enumerate(rows, 1):
+        writer.writerow([_csv_value(value) for value in row])
+        if index % settings.EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, default=_json_default))
+        if len(lines) >= settings.EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def stream_export(build_query: Callable[[Session], Query], export_format: str) -> Iterator[str]:
+    """Построчная выгрузка с серверным курсором (yield_per): память не зависит от размера таблицы.
+
+    Сессия открывается внутри генератора — ответ читается уже после выхода из
+    обработчика, когда сессия из get_db закрыта.
+    """
+    db = SessionLocal()
+    try:
+        rows = export_query(build_query(db)).yield_per(settings.EXPORT_BATCH_SIZE)
+        chunks = _csv_chunks(rows) if export_format == "csv" else _ndjson_chunks(rows)
+        yield from chunks
+    finally:
+        db.close()
@@ -0,0 +1,170 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.comment import Notification
+from app.services.notification_hub import stage_notifications
+from app.services.notifications import adjust_unread
+from app.utils.logger import logger
+
+
+# Ключ в session.info: рассылки, которые уйдут в фон после commit запроса
+PENDING_KEY = "pending_fanout"
+
+notifications_table = Notification.__table__
+
+
+@dataclass(frozen=True)
+class NotificationEvent:
+    """Одно событие, о котором уведомляется набор получателей"""
+    type: str
+    message: str
+    ticket_id: Optional[int] = None
+    comment_id: Optional[int] = None
+    actor_id: Optional[int] = None
+
+
+def coalesced_types() -> Set[str]:
+    return {t.strip() for t in settings.NOTIFICATION_COALESCE_TYPES.split(",") if t.strip()}
+
+
+def _coalesce(db: Session, notification: NotificationEvent, user_ids: List[int], now: datetime) -> List[Tuple[int, int]]:
+    """
+    Свернуть событие в непрочитанное уведомление того же типа по той же заявке,
+    появившееся за последнее окно: event_count + 1, последний автор и текст,
+    время — текущее (уведомление поднимается наверх ленты). Счётчик непрочитанных
+    не меняется. Возвращает [(user_id, id)] свёрнутых.
+    """
+    window = settings.NOTIFICATION_COALESCE_WINDOW_SECONDS
+    if not window or notification.ticket_id is None or notification.type not in coalesced_types():
+        return []
+    return db.execute(
+        update(notifications_table)
+        .where(
+            notifications_table.c.user_id.in_(user_ids),
+            notifications_table.c.is_read == False,
+            notifications_table.c.created_at >= now - timedelta(seconds=window),
+            notifications_table.c.ticket_id == notification.ticket_id,
+            notifications_table.c.type == notification.type,
+        )
+        .values(
+            event_count=notifications_table.c.event_count + 1,
+            last_actor_id=notification.actor_id,
+            comment_id=notification.comment_id,
+            message=notification.message,
+            created_at=now,
+        )
+        .returning(notifications_table.c.user_id, notifications_table.c.id)
+    ).all()
+
+
+def fan_out(db: Session, jobs: Iterable[Tuple[NotificationEvent, Iterable[int]]]) -> int:
+    """
+    Записать уведомления [(событие, получатели)] одним multi-row INSERT ... RETURNING
+    на все события, обновить счётчики получателей и запланировать push после commit.
+    Без commit. Для типов из NOTIFICATION_COALESCE_TYPES сначала пробует свернуть
+    событие в уже существующее непрочитанное уведомление (см. _coalesce).
+    """
+    now = datetime.utcnow()
+    rows, staged = [], []
+    for notification, recipients in jobs:
+        user_ids = sorted({user_id for user_id in recipients if user_id})
+        if not user_ids:
+            continue
+        coalesced = _coalesce(db, notification, user_ids, now)
+        if coalesced:
+            staged.extend(coalesced)
+            folded = {user_id for user_id, _ in coalesced}
+            user_ids = [user_id for user_id in user_ids if user_id not in folded]
+        rows.extend(
+            {
+                "user_id": user_id,
+                "ticket_id": notification.ticket_id,
+                "comment_id": notification.comment_id,
+                "type": notification.type,
+                "message": notification.message,
+                "is_read": False,
+                "created_at": now,
+                "event_count": 1,
+                "last_actor_id": notification.actor_id,
+            }
+            for user_id in user_ids
+        )
+    if rows:
+        created = db.execute(
+            insert(Notification).returning(Notification.user_id, Notification.id), rows
+        ).all()
+        adjust_unread(db, Counter(row["user_id"] for row in rows))
+        staged.extend(created)
+    if staged:
+        stage_notifications(db, notifications=staged)
+    return len(staged)
+
+
+_fanout_executor = ThreadPoolExecutor(
+    max_workers=settings.NOTIFICATION_FANOUT_WORKERS,
+    thread_name_prefix="notification-fanout",
+)
+
+
+def _run_fanout(jobs: List[Tuple[NotificationEvent, List[int]]]):
+    """Фоновая рассылка: своя сессия, повтор с экспоненциальной паузой при ошибке БД"""
+    for attempt in range(1, settings.NOTIFICATION_FANOUT_RETRIES + 1):
+        db = SessionLocal()
+        try:
+            fan_out(db, jobs)
+            db.commit()
+            return
+        except Exception as e:
+            db.rollback()
+            if attempt == settings.NOTIFICATION_FANOUT_RETRIES:
+                logger.error(f"Notification fan-out failed after {attempt} attempts: {e}")
+                return
+            logger.warning(f"Notification fan-out attempt {attempt} failed: {e}")
+            time.sleep(0.5 * 2 ** (attempt - 1))
+        finally:
+            db.close()
+
+
+def notify(db: Session, notification: NotificationEvent, recipients: Iterable[int]):
+    """
+    Уведомить получателей. В фоновом режиме (NOTIFICATION_FANOUT_ASYNC) строки
+    пишутся уже после commit запроса и ответа клиенту; при rollback рассылки нет.
+    """
+    notify_many(db, [(notification, recipients)])
+
+
+def notify_many(db: Session, jobs: Iterable[Tuple[NotificationEvent, Iterable[int]]]):
+    """notify для набора событий (массовые операции): одна пачка на все события"""
+    jobs = [(notification, list(recipients)) for notification, recipients in jobs]
+    if not jobs:
+        return
+    if not settings.NOTIFICATION_FANOUT_ASYNC:
+        fan_out(db, jobs)
+        return
+    db.info.setdefault(PENDING_KEY, []).extend(jobs)
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_pending(session):
+    jobs = session.info.pop(PENDING_KEY, None)
+    if jobs:
+        _fanout_executor.submit(_run_fanout, jobs)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+def shutdown_fanout_executor():
+    # Дожидаемся уже поставленных рассылок — иначе уведомления потеряются
+    _fanout_executor.shutdown(wait=True)
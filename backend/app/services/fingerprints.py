@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, aliased
+
+from app.models.comment import Comment, TicketHistory
+from app.models.ticket import Ticket
+from app.models.ticket_link import TicketLink
+from app.utils.http_cache import make_etag
+
+
+# Отпечаток = (ETag, Last-Modified). Для одной заявки каждый считается одним
+# агрегатным запросом по индексу, чтобы ответ 304 не требовал загрузки и
+# сериализации данных; для списков — по загруженной странице.
+Fingerprint = Tuple[str, Optional[datetime]]
+
+
+def _ticket_id(db: Session, ticket_key: str):
+    return db.query(Ticket.id).filter(Ticket.key == ticket_key).scalar_subquery()
+
+
+def ticket_fingerprint(db: Session, ticket_key: str) -> Optional[Fingerprint]:
+    row = db.query(Ticket.id, Ticket.updated_at).filter(Ticket.key == ticket_key).first()
+    if row is None:
+        return None
+    return make_etag("ticket", row.id, row.updated_at), row.updated_at
+
+
+def _children_fingerprint(name: str, row) -> Optional[Fingerprint]:
+    # ticket_id в отпечатке: удалённая и заново созданная заявка не получит старый ETag
+    ticket_id, count, max_id, last_modified = row
+    if ticket_id is None:
+        return None
+    return make_etag(name, ticket_id, count, max_id, last_modified), last_modified
+
+
+def comments_fingerprint(db: Session, ticket_key: str) -> Optional[Fingerprint]:
+    ticket_id = _ticket_id(db, ticket_key)
+    row = db.query(
+        ticket_id, func.count(Comment.id), func.max(Comment.id), func.max(Comment.updated_at)
+    ).filter(Comment.ticket_id == ticket_id).one()
+    return _children_fingerprint("comments", row)
+
+
+def history_fingerprint(db: Session, ticket_key: str) -> Optional[Fingerprint]:
+    ticket_id = _ticket_id(db, ticket_key)
+    row = db.query(
+        ticket_id, func.count(TicketHistory.id), func.max(TicketHistory.id), func.max(TicketHistory.created_at)
+    ).filter(TicketHistory.ticket_id == ticket_id).one()
+    return _children_fingerprint("history", row)
+
+
+def links_fingerprint(db: Session, ticket_key: str) -> Optional[Fingerprint]:
+    # В ответе есть статус связанных заявок — учитываем их updated_at
+    ticket_id = _ticket_id(db, ticket_key)
+    linked = aliased(Ticket)
+    row = db.query(
+        ticket_id, func.count(TicketLink.id), func.max(TicketLink.id), func.max(linked.updated_at)
+    ).select_from(TicketLink).join(
+        linked, or_(linked.id == TicketLink.source_ticket_id, linked.id == TicketLink.target_ticket_id)
+    ).filter(
+        or_(TicketLink.source_ticket_id == ticket_id, TicketLink.target_ticket_id == ticket_id)
+    ).one()
+    return _children_fingerprint("links", row)
+
+
+def list_fingerprint(rows, *params) -> Fingerprint:
+    """
+    Отпечаток уже загруженного списка (страницы) заявок + параметры запроса.
+    Строится по id и updated_at отданных строк — без COUNT/MAX по всей выборке.
+    """
+    last_modified = max((row.updated_at for row in rows if row.updated_at), default=None)
+    return make_etag("tickets", *params, *((row.id, row.updated_at) for row in rows)), last_modified
@@ -0,0 +1,82 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+from app.services.reference_data import reference_version
+
+
+# @login или @[Имя Фамилия]
+MENTION_PATTERN = re.compile(r'@\[([^\]]+)\]|@(\w+)')
+
+
+def extract_mention_names(content: str) -> List[str]:
+    """Имена из @упоминаний в порядке появления, без повторов"""
+    names = (bracketed or word for bracketed, word in MENTION_PATTERN.findall(content or ""))
+    return list(dict.fromkeys(name.strip() for name in names if name.strip()))
+
+
+@dataclass(frozen=True)
+class MentionIndex:
+    """Логины и отображаемые имена активных пользователей (без учёта регистра) -> id"""
+    version: int
+    built_at: float
+    by_login: Dict[str, int]
+    by_display_name: Dict[str, int]
+
+    def resolve(self, name: str) -> Optional[int]:
+        # Сначала точное имя, затем логин; при одинаковых именах — пользователь с меньшим id
+        key = name.casefold()
+        return self.by_display_name.get(key) or self.by_login.get(key)
+
+
+_lock = threading.Lock()
+_index: Optional[MentionIndex] = None
+
+
+def _build(db: Session, version: int) -> MentionIndex:
+    by_login, by_display_name = {}, {}
+    rows = db.query(User.id, User.login, User.display_name).filter(
+        User.is_active == True
+    ).order_by(User.id).all()
+    for user_id, login, display_name in rows:
+        by_login.setdefault(login.casefold(), user_id)
+        if display_name:
+            by_display_name.setdefault(display_name.strip().casefold(), user_id)
+    return MentionIndex(version, time.monotonic(), by_login, by_display_name)
+
+
+def get_mention_index(db: Session) -> MentionIndex:
+    """
+    Индекс упоминаний в памяти процесса: перестраивается одним запросом, когда
+    меняются пользователи (invalidate_reference_data) или истёк TTL (другие воркеры).
+    """
+    global _index
+    version = reference_version()
+    index = _index
+    if (
+        index is not None
+        and index.version == version
+        and time.monotonic() - index.built_at < settings.REFERENCE_DATA_TTL_SECONDS
+    ):
+        return index
+
+    index = _build(db, version)
+    with _lock:
+        if version == reference_version():
+            _index = index
+    return index
+
+
+def resolve_mentions(db: Session, content: str) -> Set[int]:
+    """id упомянутых пользователей: ноль запросов при актуальном индексе, иначе один"""
+    names = extract_mention_names(content)
+    if not names:
+        return set()
+    index = get_mention_index(db)
+    return {user_id for user_id in map(index.resolve, names) if user_id}
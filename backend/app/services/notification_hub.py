@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.cache import register_cache
+
+
+# Ключ в session.info: {user_id: [id новых уведомлений]} до commit
+PENDING_KEY = "pending_notifications"
+
+# Событие переполнения: клиент не успевал читать — пусть перечитает список целиком
+RESYNC = "resync"
+
+
+class Subscription:
+    """Одно подключение к потоку уведомлений: своя ограниченная очередь в event loop"""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: "asyncio.Queue" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _put(self, item):
+        # Выполняется в event loop подключения
+        if self.queue.full():
+            # Медленный клиент не тормозит остальных: очередь заменяется одним resync
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            return
+        self.queue.put_nowait(item)
+
+    async def next_batch(self, timeout: float) -> Optional[list]:
+        """Дождаться события и забрать всё накопившееся; None — таймаут (пора слать ping)"""
+        try:
+            first = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        batch = [first]
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+
+class NotificationHub:
+    """In-process pub/sub уведомлений по user_id (публикация — из любого потока)"""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(
+            user_id, asyncio.get_running_loop(), settings.NOTIFICATION_STREAM_QUEUE_SIZE
+        )
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: int, item):
+        """item — список id новых уведомлений (пустой — изменился только счётчик)"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, item)
+            except RuntimeError:
+                # event loop уже закрыт — подключение умерло вместе с ним
+                self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._subscribers),
+                "connections": sum(len(s) for s in self._subscribers.values()),
+            }
+
+
+hub = NotificationHub()
+# Число подключений — в общей статистике /api/users/stats/cache
+register_cache("notification_stream", hub)
+
+
+def stage_notifications(db: Session, user_ids: Iterable[int] = (),
+                        notifications: Iterable[Tuple[int, int]] = ()):
+    """
+    Запланировать публикацию после commit сессии (при rollback — отбрасывается).
+    notifications — пары (user_id, id нового уведомления); для user_ids
+    подписчики получат только новый счётчик непрочитанных.
+    """
+    pending = db.info.setdefault(PENDING_KEY, {})
+    for user_id in user_ids:
+        pending.setdefault(user_id, [])
+    for user_id, notification_id in notifications:
+        pending.setdefault(user_id, []).append(notification_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    pending: Dict[int, List[int]] = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    for user_id, notification_ids in pending.items():
+        hub.publish(user_id, notification_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session):
+    session.info.pop(PENDING_KEY, None)
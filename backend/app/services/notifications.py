@@ -0,0 +1,161 @@
+from datetime import datetime
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.models.comment import Notification
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services.notification_hub import stage_notifications
+from app.services.pagination import decode_cursor, encode_cursor
+
+
+users_table = User.__table__
+notifications_table = Notification.__table__
+
+
+def notification_payload(notification: Notification, ticket_key: Optional[str], ticket_title: Optional[str]) -> dict:
+    return {
+        "id": notification.id,
+        "type": notification.type,
+        "message": notification.message,
+        "ticket_id": notification.ticket_id,
+        "ticket_key": ticket_key,
+        "ticket_title": ticket_title,
+        "is_read": notification.is_read,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+        "event_count": notification.event_count,
+        "last_actor_id": notification.last_actor_id,
+    }
+
+
+def _notifications_query(db: Session, user_id: int):
+    return db.query(Notification, Ticket.key, Ticket.title).outerjoin(
+        Ticket, Ticket.id == Notification.ticket_id
+    ).filter(Notification.user_id == user_id).order_by(
+        Notification.created_at.desc(), Notification.id.desc()
+    )
+
+
+def load_notifications(db: Session, user_id: int, ids: Optional[Iterable[int]] = None, limit: int = 50) -> List[dict]:
+    """Уведомления пользователя (новые сверху) с ключом и названием заявки одним запросом"""
+    query = _notifications_query(db, user_id)
+    if ids is not None:
+        query = query.filter(Notification.id.in_(list(ids)))
+    rows = query.limit(limit).all()
+    return [notification_payload(n, ticket_key, ticket_title) for n, ticket_key, ticket_title in rows]
+
+
+def paginate_notifications(db: Session, user_id: int, limit: int, before: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """Keyset-страница ленты по (created_at desc, id desc); before — курсор из предыдущей страницы"""
+    query = _notifications_query(db, user_id)
+    if before:
+        created_at, notification_id = decode_cursor(before)
+        query = query.filter(or_(
+            Notification.created_at < created_at,
+            and_(Notification.created_at == created_at, Notification.id < notification_id),
+        ))
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return [notification_payload(n, ticket_key, ticket_title) for n, ticket_key, ticket_title in rows[:limit]], next_cursor
+
+
+def count_unread(db: Session, user_id: int) -> int:
+    """Счётчик непрочитанных из users.unread_notifications — без COUNT(*) по уведомлениям"""
+    return db.query(User.unread_notifications).filter(User.id == user_id).scalar() or 0
+
+
+def adjust_unread(db: Session, deltas: Mapping[int, int]):
+    """
+    Изменить счётчики непрочитанных в той же транзакции, что и уведомления.
+    Инкремент в SQL (unread = unread + delta) — параллельные запросы не теряют изменений.
+    """
+    params = [
+        {"user_id": user_id, "delta": delta}
+        for user_id, delta in sorted(deltas.items())  # один порядок блокировок строк users
+        if user_id and delta
+    ]
+    if not params:
+        return
+    db.execute(
+        update(users_table)
+        .where(users_table.c.id == bindparam("user_id"))
+        .values(unread_notifications=users_table.c.unread_notifications + bindparam("delta")),
+        params,
+    )
+
+
+def read_notification(db: Session, user_id: int, notification_id: int) -> bool:
+    """Пометить уведомление прочитанным; False — не найдено или уже прочитано"""
+    updated = db.query(Notification).filter(
+        Notification.id == notification_id,
+        Notification.user_id == user_id,
+        Notification.is_read == False
+    ).update({"is_read": True}, synchronize_session=False)
+    if updated:
+        adjust_unread(db, {user_id: -updated})
+        stage_notifications(db, [user_id])
+    return bool(updated)
+
+
+def read_all_notifications(db: Session, user_id: int) -> int:
+    """Пометить все прочитанными; счётчик уменьшается на число реально изменённых строк"""
+    updated = db.query(Notification).filter(
+        Notification.user_id == user_id,
+        Notification.is_read == False
+    ).update({"is_read": True}, synchronize_session=False)
+    if updated:
+        adjust_unread(db, {user_id: -updated})
+        stage_notifications(db, [user_id])
+    return updated
+
+
+def delete_notifications(db: Session, *criteria) -> int:
+    """Удалить уведомления по условию, вычтя непрочитанные из счётчиков их получателей"""
+    unread = db.query(Notification.user_id, func.count()).filter(
+        *criteria, Notification.is_read == False
+    ).group_by(Notification.user_id).all()
+    deleted = db.query(Notification).filter(*criteria).delete(synchronize_session=False)
+    if unread:
+        adjust_unread(db, {user_id: -count for user_id, count in unread})
+        stage_notifications(db, [user_id for user_id, _ in unread])
+    return deleted
+
+
+def retract_comment_notifications(db: Session, comment_id: int) -> int:
+    """
+    Убрать из уведомлений событие удаляемого комментария (до удаления самого
+    комментария). Свёрнутое уведомление хранит comment_id последнего события:
+    оно теряет одно событие и отвязывается от комментария, иначе каскад удалил
+    бы и поглощённые ранние события. Уведомления из одного события удаляются.
+    """
+    folded = db.execute(
+        update(notifications_table)
+        .where(
+            notifications_table.c.comment_id == comment_id,
+            notifications_table.c.event_count > 1,
+        )
+        .values(event_count=notifications_table.c.event_count - 1, comment_id=None)
+        .returning(notifications_table.c.user_id, notifications_table.c.id)
+    ).all()
+    if folded:
+        stage_notifications(db, notifications=folded)
+    return len(folded) + delete_notifications(db, Notification.comment_id == comment_id)
+
+
+def purge_read_notifications(db: Session, older_than: datetime, batch_size: int) -> int:
+    """
+    Удалить прочитанные уведомления старше older_than небольшими пачками,
+    с commit после каждой — блокировки короткие, а счётчики непрочитанных не меняются.
+    """
+    total = 0
+    while True:
+        ids = [notification_id for (notification_id,) in db.query(Notification.id).filter(
+            Notification.is_read == True,
+            Notification.created_at < older_than
+        ).order_by(Notification.id).limit(batch_size)]
+        if not ids:
+            return total
+        total += db.query(Notification).filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
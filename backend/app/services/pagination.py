@@ -0,0 +1,73 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.models.ticket import Ticket
+
+
+def encode_cursor(ticket: Ticket) -> str:
+    """Курсор на позицию после заявки: (created_at, id)"""
+    raw = json.dumps([ticket.created_at.isoformat(), ticket.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+def paginate_tickets(query: Query, limit: int, cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    """Keyset-пагинация по (created_at desc, id desc): без OFFSET и полной сортировки"""
+    if cursor:
+        created_at, ticket_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Ticket.created_at < created_at,
+            and_(Ticket.created_at == created_at, Ticket.id < ticket_id),
+        ))
+
+    rows = query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
+
+
+def _planner_estimate(db: Session, query: Query) -> Optional[int]:
+    """Оценка числа строк из статистики планировщика PostgreSQL"""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = query.statement.compile(
+        dialect=bind.dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    plan = db.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_tickets(db: Session, query: Query, mode: str) -> Tuple[int, bool]:
+    """Общее количество: (total, is_estimate).
+
+    mode="exact" — всегда COUNT(*); mode="estimate" — оценка планировщика,
+    а для небольших выборок (ниже TICKETS_EXACT_COUNT_THRESHOLD) — точный подсчёт.
+    """
+    if mode == "estimate":
+        estimate = _planner_estimate(db, query)
+        if estimate is not None and estimate > settings.TICKETS_EXACT_COUNT_THRESHOLD:
+            return estimate, True
+    return query.order_by(None).count(), False
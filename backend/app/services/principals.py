@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import settings
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class RoleSnapshot:
+    """Снимок роли пользователя (без привязки к сессии БД)"""
+    id: int
+    name: str
+    display_name: str
+    prefix: Optional[str]
+    is_admin: bool
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Аутентифицированный пользователь: по атрибутам совместим с User"""
+    id: int
+    login: str
+    display_name: Optional[str]
+    role_id: int
+    role: RoleSnapshot
+    is_active: bool
+    created_at: Optional[datetime]
+    last_login: Optional[datetime]
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        role = user.role
+        return cls(
+            id=user.id,
+            login=user.login,
+            display_name=user.display_name,
+            role_id=user.role_id,
+            role=RoleSnapshot(
+                id=role.id,
+                name=role.name,
+                display_name=role.display_name,
+                prefix=role.prefix,
+                is_admin=bool(role.is_admin),
+            ),
+            is_active=bool(user.is_active),
+            created_at=user.created_at,
+            last_login=user.last_login,
+            token_version=user.token_version or 0,
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "Principal":
+        """Собрать пользователя из claims токена (без обращения к БД)"""
+        role = payload["role"]
+        return cls(
+            id=int(payload["sub"]),
+            login=payload["login"],
+            display_name=payload.get("name"),
+            role_id=role["id"],
+            role=RoleSnapshot(
+                id=role["id"],
+                name=role["name"],
+                display_name=role["display_name"],
+                prefix=role.get("prefix"),
+                is_admin=bool(role["is_admin"]),
+            ),
+            is_active=True,
+            created_at=None,
+            last_login=None,
+            token_version=payload["ver"],
+        )
+
+
+def build_token_claims(user: User) -> dict:
+    """Claims для JWT: снимок роли и версия токена пользователя"""
+    role = user.role
+    return {
+        "sub": str(user.id),
+        "ver": user.token_version or 0,
+        "login": user.login,
+        "name": user.display_name,
+        "role": {
+            "id": role.id,
+            "name": role.name,
+            "display_name": role.display_name,
+            "prefix": role.prefix,
+            "is_admin": bool(role.is_admin),
+        },
+    }
+
+
+def has_embedded_claims(payload: dict) -> bool:
+    return "ver" in payload and isinstance(payload.get("role"), dict)
+
+
+principal_cache = TTLCache(
+    "principals",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """Получить пользователя с ролью из кэша или одним запросом к БД"""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = db.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
+    if user is None:
+        return None
+
+    principal = Principal.from_user(user)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+def invalidate_principal(user_id: int):
+    """Сбросить кэш пользователя после изменения роли, статуса или удаления"""
+    principal_cache.pop(user_id)
+    token_state_cache.pop(user_id)
+
+
+# user_id -> (token_version, is_active): дешёвая проверка токенов с claims
+token_state_cache = TTLCache(
+    "token_versions",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.TOKEN_VERSION_CACHE_TTL_SECONDS,
+)
+
+
+def load_token_state(db: Session, user_id: int) -> Optional[Tuple[int, bool]]:
+    """Текущая версия токена и активность пользователя (без join с ролью)"""
+    state = token_state_cache.get(user_id)
+    if state is not None:
+        return state
+
+    row = db.query(User.token_version, User.is_active).filter(User.id == user_id).first()
+    if row is None:
+        return None
+
+    state = (row.token_version or 0, bool(row.is_active))
+    token_state_cache.set(user_id, state)
+    return state
+
+
+def bump_token_version(user: User):
+    """Отозвать выданные токены с claims (роль или статус изменились)"""
+    user.token_version = (user.token_version or 0) + 1
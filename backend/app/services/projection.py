@@ -0,0 +1,80 @@
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Query, aliased
+
+from app.models.ticket import Ticket
+from app.models.user import User, Role
+
+
+# Поля, которые можно запросить через ?fields=
+TICKET_COLUMNS = {
+    name: getattr(Ticket, name)
+    for name in (
+        "id", "key", "title", "description", "status", "priority",
+        "author_id", "assignee_id", "role_id",
+        "deadline", "time_spent", "timer_started_at",
+        "created_at", "updated_at", "resolved_at",
+    )
+}
+
+# Связи отдаются вложенными объектами, как в TicketList
+RELATION_COLUMNS = {
+    "author": (User, "author_id", ("id", "login", "display_name")),
+    "assignee": (User, "assignee_id", ("id", "login", "display_name")),
+    "role": (Role, "role_id", ("id", "name", "prefix", "display_name")),
+}
+
+# Нужны для курсора keyset-пагинации и ETag, в ответ попадают только если запрошены
+_SERVICE_COLUMNS = ("id", "created_at", "updated_at")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """'key,title,status' -> ['key', 'title', 'status'] (400 на неизвестное поле)"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in TICKET_COLUMNS and name not in RELATION_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные поля: {', '.join(unknown)}")
+    if "id" not in names:
+        names.insert(0, "id")
+    return list(dict.fromkeys(names))
+
+
+def project_tickets(query: Query, fields: List[str]) -> Query:
+    """Выбрать только нужные колонки (кортежи строк, без ORM-объектов)"""
+    columns = []
+    for name in dict.fromkeys([*fields, *_SERVICE_COLUMNS]):
+        if name in TICKET_COLUMNS:
+            columns.append(TICKET_COLUMNS[name].label(name))
+
+    joins = []
+    for name in fields:
+        if name not in RELATION_COLUMNS:
+            continue
+        model, fk, attrs = RELATION_COLUMNS[name]
+        alias = aliased(model, name=f"{name}_rel")
+        joins.append((alias, getattr(alias, "id") == getattr(Ticket, fk)))
+        columns.extend(getattr(alias, attr).label(f"{name}__{attr}") for attr in attrs)
+
+    query = query.with_entities(*columns)
+    for alias, onclause in joins:
+        query = query.outerjoin(alias, onclause)
+    return query
+
+
+def rows_to_dicts(rows, fields: List[str]) -> List[dict]:
+    result = []
+    for row in rows:
+        mapping = row._mapping
+        item = {}
+        for name in fields:
+            if name in RELATION_COLUMNS:
+                attrs = RELATION_COLUMNS[name][2]
+                nested = {attr: mapping[f"{name}__{attr}"] for attr in attrs}
+                item[name] = nested if nested["id"] is not None else None
+            else:
+                item[name] = mapping[name]
+        result.append(item)
+    return result
@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User, Role
+from app.utils.http_cache import make_etag
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Снимок почти неизменных справочников: роли и активные пользователи"""
+    version: int
+    roles: List[dict]
+    users: List[dict]
+    built_at: float
+    content_hash: str
+
+    def etag(self, *parts) -> str:
+        # Хеш содержимого, а не номер версии: у разных воркеров номера не совпадают
+        return make_etag(self.content_hash, *parts)
+
+
+_lock = threading.Lock()
+_version = 0
+_snapshot: Optional[ReferenceSnapshot] = None
+
+
+def _build(db: Session, version: int) -> ReferenceSnapshot:
+    roles = [
+        {
+            "id": r.id,
+            "name": r.name,
+            "display_name": r.display_name,
+            "prefix": r.prefix,
+            "is_admin": bool(r.is_admin),
+        }
+        for r in db.query(Role).order_by(Role.id).all()
+    ]
+    users = [
+        {"id": u.id, "login": u.login, "display_name": u.display_name}
+        for u in db.query(User.id, User.login, User.display_name).filter(User.is_active == True).order_by(User.id).all()
+    ]
+    return ReferenceSnapshot(
+        version=version,
+        roles=roles,
+        users=users,
+        built_at=time.monotonic(),
+        content_hash=make_etag(json.dumps([roles, users], sort_keys=True, ensure_ascii=False)),
+    )
+
+
+def get_reference_data(db: Session) -> ReferenceSnapshot:
+    """Текущий снимок; перестраивается после invalidate или по истечении TTL (другие воркеры)"""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - snapshot.built_at < settings.REFERENCE_DATA_TTL_SECONDS:
+        return snapshot
+
+    version = _version
+    snapshot = _build(db, version)
+    with _lock:
+        # Если пока строили, данные успели измениться — снимок не сохраняем
+        if version == _version:
+            _snapshot = snapshot
+    return snapshot
+
+
+def reference_version() -> int:
+    """Номер версии справочников в этом процессе (растёт при каждом invalidate)"""
+    return _version
+
+
+def invalidate_reference_data():
+    """Вызывать после изменения пользователей или ролей"""
+    global _version, _snapshot
+    with _lock:
+        _version += 1
+        _snapshot = None
@@ -0,0 +1,158 @@
+import json
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+from app.config import settings
+from app.utils.cache import TTLCache, register_cache
+from app.utils.logger import logger
+
+try:
+    import redis
+except ImportError:  # Redis — необязательная зависимость
+    redis = None
+
+
+# Эндпоинты, ответы которых кэшируются по ключу заявки
+CACHED_SECTIONS = ("ticket", "comments", "history", "links")
+
+# Ответы не зависят от пользователя, но права могут влиять на содержимое —
+# кэшируем отдельно для каждого класса прав
+PERMISSION_CLASSES = ("admin", "user")
+
+
+class MemoryBackend:
+    """LRU в памяти процесса (TTLCache)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache("responses", maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Any:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Any):
+        self.cache.set(key, value)
+
+    def delete(self, keys: Iterable[str]):
+        for key in keys:
+            self.cache.pop(key)
+
+
+class RedisBackend:
+    """Общий кэш для нескольких воркеров (любой сервер с протоколом Redis)"""
+
+    prefix = "gerask:response:"
+
+    def __init__(self, url: str, ttl: float, maxsize: int):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2)
+        self.name = "responses"
+        self.ttl = int(ttl)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        register_cache(self.name, self)
+
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def get(self, key: str) -> Any:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except redis.RedisError:
+            self._count("errors")
+            return None
+        if raw is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any):
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+        except redis.RedisError:
+            self._count("errors")
+
+    def delete(self, keys: Iterable[str]):
+        keys = [self.prefix + key for key in keys]
+        if not keys:
+            return
+        try:
+            self.client.delete(*keys)
+        except redis.RedisError:
+            self._count("errors")
+
+    def stats(self) -> dict:
+        # Вытеснение выполняет сам сервер (maxmemory-policy)
+        evictions = None
+        try:
+            evictions = self.client.info("stats").get("evicted_keys")
+        except redis.RedisError:
+            pass
+        return {
+            "name": self.name,
+            "backend": "redis",
+            "size": None,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": evictions,
+            "errors": self.errors,
+        }
+
+
+def _create_backend():
+    backend = settings.RESPONSE_CACHE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "redis":
+        if redis is not None:
+            return RedisBackend(settings.RESPONSE_CACHE_URL, settings.RESPONSE_CACHE_TTL_SECONDS,
+                                settings.RESPONSE_CACHE_SIZE)
+        logger.warning("RESPONSE_CACHE_BACKEND=redis, but redis is not installed; using memory")
+    return MemoryBackend(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+_backend = _create_backend()
+
+
+def permission_class(user) -> str:
+    return "admin" if user.role.is_admin else "user"
+
+
+def _key(section: str, ticket_key: str, permission: str) -> str:
+    return f"{section}:{ticket_key}:{permission}"
+
+
+def cached_response(section: str, ticket_key: str, user, etag: str, build: Callable[[], Any]) -> Any:
+    """
+    Ответ из кэша или build() (результат должен быть JSON-совместимым).
+    Запись хранится вместе с ETag, под которым её построили, и отдаётся только
+    при совпадении с текущим: ответ, собранный до чужого commit и записанный
+    после инвалидации, не переживёт следующего изменения отпечатка.
+    """
+    if _backend is None:
+        return build()
+    key = _key(section, ticket_key, permission_class(user))
+    entry = _backend.get(key)
+    if entry is not None and entry["etag"] == etag:
+        return entry["data"]
+    value = build()
+    _backend.set(key, {"etag": etag, "data": value})
+    return value
+
+
+def invalidate_ticket(*ticket_keys: str, sections: Optional[Iterable[str]] = None):
+    """Сбросить закэшированные ответы заявок (вызывается после commit в обработчиках записи)"""
+    if _backend is None:
+        return
+    sections = tuple(sections or CACHED_SECTIONS)
+    _backend.delete(
+        _key(section, ticket_key, permission)
+        for ticket_key in ticket_keys if ticket_key
+        for section in sections
+        for permission in PERMISSION_CLASSES
+    )
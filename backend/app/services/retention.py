@@ -0,0 +1,31 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.notifications import purge_read_notifications
+from app.utils.logger import logger
+
+
+def purge_expired_notifications() -> int:
+    """Удалить прочитанные уведомления старше NOTIFICATION_RETENTION_DAYS"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    db = SessionLocal()
+    try:
+        return purge_read_notifications(db, cutoff, settings.NOTIFICATION_PURGE_BATCH_SIZE)
+    finally:
+        db.close()
+
+
+async def retention_loop():
+    """Периодическая очистка в фоне процесса (запускается в lifespan)"""
+    while True:
+        try:
+            deleted = await run_in_threadpool(purge_expired_notifications)
+            if deleted:
+                logger.info(f"Notification retention: deleted {deleted} read notifications")
+        except Exception as e:
+            logger.error(f"Notification retention failed: {e}")
+        await asyncio.sleep(settings.NOTIFICATION_PURGE_INTERVAL_SECONDS)
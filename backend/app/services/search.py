@@ -0,0 +1,280 @@
+import html
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, inspect, literal_column, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import column, table
+
+from app.config import settings
+from app.models.ticket import Ticket
+from app.utils.cache import TTLCache
+from app.utils.logger import logger
+
+
+# ASU-123, DEVASU-, devasu-1
+KEY_PATTERN = re.compile(r"^([A-Za-z]+)-(\d*)$")
+
+# Конфигурация tsvector/tsquery — та же, что в генерируемой колонке
+# Ticket.search_vector; 'simple' — без стемминга
+TS_CONFIG = literal_column("'simple'::regconfig")
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+# Маркеры совпадений из БД (символы Private Use Area): текст вокруг них
+# экранируется, и только потом маркеры заменяются на <mark>
+_MATCH_START = "\ue000"
+_MATCH_STOP = "\ue001"
+
+
+def _terms(search: str) -> List[str]:
+    """Слова запроса без спецсимволов синтаксиса tsquery/FTS5"""
+    return re.findall(r"\w+", search.lower())
+
+
+def match_key(search: str) -> Optional[Tuple[str, bool]]:
+    """Похоже на ключ заявки -> (ключ или префикс, точное совпадение)"""
+    m = KEY_PATTERN.match(search.strip())
+    if not m:
+        return None
+    prefix, number = m.groups()
+    return f"{prefix.upper()}-{number}", bool(number)
+
+
+class PostgresSearchBackend:
+    """tsvector (генерируемая колонка) + GIN-индекс, ранжирование ts_rank_cd"""
+
+    vector = Ticket.search_vector
+
+    def _tsquery(self, terms: List[str]):
+        # Каждое слово — префикс: поиск работает и на недописанном слове
+        return func.to_tsquery(
+            TS_CONFIG,
+            " & ".join(f"{term}:*" for term in terms),
+        )
+
+    def filter(self, query: Query, terms: List[str]) -> Query:
+        return query.filter(self.vector.op("@@")(self._tsquery(terms)))
+
+    def ranked(self, db: Session, terms: List[str]) -> Query:
+        tsquery = self._tsquery(terms)
+        document = func.coalesce(Ticket.title, "") + " " + func.coalesce(Ticket.description, "")
+        return db.query(
+            Ticket,
+            func.ts_rank_cd(self.vector, tsquery).label("rank"),
+            func.ts_headline(
+                TS_CONFIG,
+                document,
+                tsquery,
+                f"StartSel={_MATCH_START}, StopSel={_MATCH_STOP}, MaxFragments=2, MaxWords=20",
+            ).label("snippet"),
+        ).filter(self.vector.op("@@")(tsquery)).order_by(text("rank DESC"), Ticket.id.desc())
+
+
+class SqliteSearchBackend:
+    """FTS5 external-content таблица + триггеры (для тестов и локального запуска)"""
+
+    fts = table("tickets_fts", column("rowid"))
+
+    def create_schema(self, conn: Connection):
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5("
+            "key, title, description, content='tickets', content_rowid='id')"
+        ))
+        conn.execute(text("""
+            CREATE TRIGGER IF NOT EXISTS tickets_fts_ai AFTER INSERT ON tickets BEGIN
+                INSERT INTO tickets_fts(rowid, key, title, description)
+                VALUES (new.id, new.key, new.title, new.description);
+            END
+        """))
+        conn.execute(text("""
+            CREATE TRIGGER IF NOT EXISTS tickets_fts_ad AFTER DELETE ON tickets BEGIN
+                INSERT INTO tickets_fts(tickets_fts, rowid, key, title, description)
+                VALUES ('delete', old.id, old.key, old.title, old.description);
+            END
+        """))
+        conn.execute(text("""
+            CREATE TRIGGER IF NOT EXISTS tickets_fts_au AFTER UPDATE ON tickets BEGIN
+                INSERT INTO tickets_fts(tickets_fts, rowid, key, title, description)
+                VALUES ('delete', old.id, old.key, old.title, old.description);
+                INSERT INTO tickets_fts(rowid, key, title, description)
+                VALUES (new.id, new.key, new.title, new.description);
+            END
+        """))
+
+    def _match(self, terms: List[str]):
+        expression = " ".join(f'"{term}"*' for term in terms)
+        return literal_column("tickets_fts").op("MATCH")(expression)
+
+    def filter(self, query: Query, terms: List[str]) -> Query:
+        matched = self.fts.select().with_only_columns(self.fts.c.rowid).where(self._match(terms))
+        return query.filter(Ticket.id.in_(matched))
+
+    def ranked(self, db: Session, terms: List[str]) -> Query:
+        rank = literal_column("bm25(tickets_fts, 10.0, 5.0, 1.0)")
+        snippet = literal_column(
+            f"snippet(tickets_fts, -1, '{_MATCH_START}', '{_MATCH_STOP}', '…', 16)"
+        )
+        # bm25: меньше — лучше, поэтому знак меняем
+        return db.query(Ticket, (-rank).label("rank"), snippet.label("snippet")).join(
+            self.fts, self.fts.c.rowid == Ticket.id
+        ).filter(self._match(terms)).order_by(rank, Ticket.id.desc())
+
+
+_backends = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SqliteSearchBackend(),
+}
+
+
+def get_search_backend(dialect_name: str):
+    return _backends.get(dialect_name)
+
+
+def create_sqlite_search_schema(engine):
+    """
+    FTS5-таблица и триггеры для SQLite (тесты, локальный запуск) — миграций
+    Alembic для SQLite нет. В PostgreSQL колонку и индексы создаёт create_all
+    (см. Ticket.__table_args__).
+    """
+    with engine.begin() as conn:
+        SqliteSearchBackend().create_schema(conn)
+
+
+def check_search_schema(engine):
+    """
+    Отключить бэкенд поиска, если его схемы нет в базе (таблица tickets создана
+    до появления search_vector / tickets_fts): поиск уходит в ILIKE, а не в 500.
+    """
+    dialect = engine.dialect.name
+    inspector = inspect(engine)
+    if dialect == "postgresql":
+        present = "search_vector" in {c["name"] for c in inspector.get_columns("tickets")}
+    elif dialect == "sqlite":
+        present = inspector.has_table("tickets_fts")
+    else:
+        return
+    if not present:
+        logger.warning(f"Search schema is missing in {dialect} database, falling back to ILIKE search")
+        _backends.pop(dialect, None)
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """Фрагмент из БД -> HTML: текст экранируется, совпадения в <mark>"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_STOP, HIGHLIGHT_STOP)
+
+
+def apply_search(db: Session, query: Query, search: str) -> Query:
+    """Фильтр списка заявок по строке поиска"""
+    key = match_key(search)
+    if key is not None:
+        value, exact = key
+        return query.filter(Ticket.key == value if exact else Ticket.key.like(value + "%"))
+
+    terms = _terms(search)
+    if not terms:
+        return query
+
+    backend = get_search_backend(db.get_bind().dialect.name)
+    if backend is None:
+        pattern = f"%{search}%"
+        return query.filter(Ticket.title.ilike(pattern) | Ticket.description.ilike(pattern))
+    return backend.filter(query, terms)
+
+
+def search_tickets(db: Session, search: str, limit: int, options=()) -> List[Tuple[Ticket, Optional[float], Optional[str]]]:
+    """Ранжированный поиск: [(ticket, rank, snippet)]"""
+    key = match_key(search)
+    if key is not None:
+        value, exact = key
+        query = db.query(Ticket).options(*options)
+        if exact:
+            query = query.filter(Ticket.key == value)
+        else:
+            query = query.filter(Ticket.key.like(value + "%")).order_by(Ticket.id.desc())
+        return [(ticket, None, None) for ticket in query.limit(limit).all()]
+
+    terms = _terms(search)
+    if not terms:
+        return []
+
+    backend = get_search_backend(db.get_bind().dialect.name)
+    if backend is None:
+        query = apply_search(db, db.query(Ticket).options(*options), search)
+        return [(ticket, None, None) for ticket in query.limit(limit).all()]
+    return [
+        (ticket, rank, highlight(snippet))
+        for ticket, rank, snippet in backend.ranked(db, terms).options(*options).limit(limit).all()
+    ]
+
+
+# Подсказки по префиксу: одинаковые запросы при наборе текста отдаются из памяти
+suggest_cache = TTLCache(
+    "ticket_suggest",
+    maxsize=settings.SUGGEST_CACHE_SIZE,
+    ttl=settings.SUGGEST_CACHE_TTL_SECONDS,
+)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Короче трёх символов у строки нет ни одной триграммы: ILIKE '%q%' по названию
+# не сужается индексом, поэтому такие запросы ищут только по префиксу ключа
+TITLE_MATCH_MIN_LENGTH = 3
+
+
+def _suggest_by_key(db: Session, prefix: str, limit: int):
+    query = db.query(Ticket.key, Ticket.title, Ticket.status).filter(
+        Ticket.key.like(_escape_like(prefix) + "%", escape="\\")
+    )
+    # Побайтовый порядок ключей: точное совпадение — самая короткая строка с
+    # этим префиксом и идёт первым, а ORDER BY ... LIMIT отдаётся индексом
+    # ix_tickets_key_pattern (text_pattern_ops) без сортировки всех совпадений
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.order_by(text("tickets.key USING ~<~"))
+    else:
+        query = query.order_by(Ticket.key)
+    return query.limit(limit).all()
+
+
+def _suggest_by_title(db: Session, search: str, limit: int):
+    query = db.query(Ticket.key, Ticket.title, Ticket.status).filter(
+        Ticket.title.ilike(f"%{_escape_like(search)}%", escape="\\")
+    )
+    # KNN по GiST-индексу ix_tickets_title_trgm: первые N ближайших отдаёт
+    # сам индекс, без оценки и сортировки всех совпадений
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.order_by(Ticket.title.op("<->")(search))
+    else:
+        query = query.order_by(Ticket.id.desc())
+    return query.limit(limit).all()
+
+
+def suggest_tickets(db: Session, search: str, limit: int) -> List[dict]:
+    """Топ-N {key, title, status} для автодополнения (ключ — по префиксу, название — по триграммам)"""
+    search = search.strip()
+    cache_key = (search.lower(), limit)
+    cached = suggest_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    key = match_key(search)
+    if key is not None:
+        rows = _suggest_by_key(db, key[0], limit)
+    else:
+        rows = _suggest_by_key(db, search.upper(), limit)
+        if len(search) >= TITLE_MATCH_MIN_LENGTH and len(rows) < limit:
+            seen = {row.key for row in rows}
+            rows += [row for row in _suggest_by_title(db, search, limit) if row.key not in seen]
+
+    result = [
+        {"key": row.key, "title": row.title, "status": row.status}
+        for row in rows[:limit]
+    ]
+    suggest_cache.set(cache_key, result)
+    return result
@@ -0,0 +1,264 @@
+import csv
+import io
+import json
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.comment import Notification, TicketHistory
+from app.models.ticket import Ticket, TicketStatus
+from app.models.user import Role, User
+from app.schemas.ticket import TicketCreate
+from app.services.notification_hub import stage_notifications
+from app.services.notifications import adjust_unread
+from app.services.ticket_keys import allocate_ticket_numbers
+from app.utils.logger import logger
+
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Сколько ошибок валидации держать в отчёте (остальные только считаются)
+MAX_REPORTED_ERRORS = 100
+
+TICKET_COPY_COLUMNS = (
+    "key", "title", "description", "status", "priority", "author_id", "assignee_id",
+    "role_id", "deadline", "time_spent", "created_at", "updated_at",
+)
+HISTORY_COPY_COLUMNS = ("ticket_id", "user_id", "action", "field_name", "old_value", "new_value", "created_at")
+NOTIFICATION_COPY_COLUMNS = ("user_id", "ticket_id", "type", "message", "is_read", "created_at")
+
+
+@dataclass
+class ImportReport:
+    """Прогресс импорта; line — номер последней обработанной записи (для продолжения)"""
+    line: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: List[dict] = field(default_factory=list)
+    # Пачка после line не записалась (ошибка БД): импорт остановлен, продолжать с line
+    aborted: Optional[str] = None
+
+    def add_error(self, line: int, detail):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "detail": detail})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, dict]]:
+    """(номер записи, словарь полей) из CSV с заголовком или NDJSON"""
+    if fmt == "csv":
+        for number, record in enumerate(csv.DictReader(stream), 1):
+            # Пустая ячейка CSV — «не задано», а не пустая строка
+            yield number, {name: value for name, value in record.items() if name and value != ""}
+    else:
+        number = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, {"__error__": f"Некорректный JSON: {e}"}
+
+
+def _copy_rows(db: Session, table: str, columns: tuple, rows: List[tuple]):
+    """COPY ... FROM STDIN через psycopg2 в рамках текущей транзакции сессии"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+class TicketImporter:
+    """
+    Пакетный импорт заявок: номера ключей резервируются блоком на префикс,
+    заявки, история и уведомления пишутся одной пачкой на таблицу (COPY на PostgreSQL).
+    Каждая пачка — отдельная транзакция, после commit вызывается on_progress;
+    на первой незаписанной пачке импорт останавливается (ImportReport.aborted).
+    """
+
+    def __init__(self, db: Session, author: User, default_role_id: Optional[int] = None,
+                 batch_size: Optional[int] = None):
+        self.db = db
+        self.author = author
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.use_copy = db.get_bind().dialect.name == "postgresql"
+        self.roles: Dict[int, str] = dict(
+            db.query(Role.id, Role.prefix).filter(Role.prefix.isnot(None)).all()
+        )
+        self.default_role_id = default_role_id or (
+            author.role_id if author.role_id in self.roles else None
+        )
+
+    def run(self, records: Iterator[Tuple[int, dict]], report: Optional[ImportReport] = None,
+            on_progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+        """
+        Записи с номером <= report.line пропускаются (продолжение с контрольной точки).
+        Если пачка не записалась, импорт останавливается: report.aborted — причина,
+        report.line — последняя запись уже закоммиченных пачек.
+        """
+        report = report or ImportReport()
+        start_after = report.line
+        batch = []
+        try:
+            for number, record in records:
+                if number <= start_after:
+                    continue
+                batch.append((number, record))
+                if len(batch) >= self.batch_size:
+                    if not self._try_batch(batch, report, on_progress):
+                        return report
+                    batch = []
+        except (ValueError, csv.Error) as e:
+            # Битая кодировка или CSV посреди файла: дальше читать нечего
+            report.aborted = f"Файл не читается после записи {report.line}: {e}"
+            return report
+        if batch:
+            self._try_batch(batch, report, on_progress)
+        return report
+
+    def _try_batch(self, batch, report: ImportReport, on_progress) -> bool:
+        # Копия отчёта: ошибки валидации упавшей пачки не должны попасть в итог
+        attempt = ImportReport(**report.to_dict())
+        try:
+            self._import_batch(batch, attempt)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Ticket import failed in records {batch[0][0]}-{batch[-1][0]}: {e}")
+            report.aborted = f"Записи {batch[0][0]}-{batch[-1][0]} не импортированы: {e}"
+            return False
+        report.line, report.created, report.failed, report.errors = (
+            attempt.line, attempt.created, attempt.failed, attempt.errors
+        )
+        if on_progress:
+            on_progress(report)
+        return True
+
+    def _validate(self, batch, report: ImportReport) -> List[Tuple[int, TicketCreate, int]]:
+        valid = []
+        for number, record in batch:
+            if "__error__" in record:
+                report.add_error(number, record["__error__"])
+                continue
+            try:
+                data = TicketCreate.model_validate(record)
+            except ValidationError as e:
+                report.add_error(number, "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+                ))
+                continue
+            role_id = data.role_id or self.default_role_id
+            if role_id not in self.roles:
+                report.add_error(number, "Неизвестная роль или роль без префикса")
+                continue
+            valid.append((number, data, role_id))
+
+        assignee_ids = {data.assignee_id for _, data, _ in valid if data.assignee_id}
+        if assignee_ids:
+            known = {user_id for (user_id,) in self.db.query(User.id).filter(User.id.in_(assignee_ids))}
+            checked = []
+            for number, data, role_id in valid:
+                if data.assignee_id and data.assignee_id not in known:
+                    report.add_error(number, "Исполнитель не найден")
+                else:
+                    checked.append((number, data, role_id))
+            valid = checked
+        return valid
+
+    def _import_batch(self, batch, report: ImportReport):
+        valid = self._validate(batch, report)
+        if valid:
+            now = datetime.utcnow()
+            by_role: Dict[int, List[Tuple[int, TicketCreate]]] = {}
+            for number, data, role_id in valid:
+                by_role.setdefault(role_id, []).append((number, data))
+
+            tickets = []
+            # Роли по возрастанию id — одинаковый порядок блокировок у параллельных импортов
+            for role_id, items in sorted(by_role.items()):
+                first = allocate_ticket_numbers(self.db, role_id, len(items))
+                prefix = self.roles[role_id]
+                for offset, (_, data) in enumerate(items):
+                    tickets.append({
+                        "key": f"{prefix}-{first + offset}",
+                        "title": data.title,
+                        "description": data.description,
+                        "status": TicketStatus.OPEN.value,
+                        "priority": data.priority.value,
+                        "author_id": self.author.id,
+                        "assignee_id": data.assignee_id,
+                        "role_id": role_id,
+                        "deadline": data.deadline,
+                        "time_spent": 0,
+                        "created_at": now,
+                        "updated_at": now,
+                    })
+
+            ids = self._insert_tickets(tickets)
+            history, notifications = [], []
+            for ticket in tickets:
+                ticket_id = ids[ticket["key"]]
+                history.append({
+                    "ticket_id": ticket_id,
+                    "user_id": self.author.id,
+                    "action": "CREATED",
+                    "field_name": None,
+                    "old_value": None,
+                    "new_value": f"Заявка {ticket['key']} создана",
+                    "created_at": now,
+                })
+                if ticket["assignee_id"] and ticket["assignee_id"] != self.author.id:
+                    notifications.append({
+                        "user_id": ticket["assignee_id"],
+                        "ticket_id": ticket_id,
+                        "type": "ASSIGNED",
+                        "message": f"Вам назначена заявка {ticket['key']}: {ticket['title']}",
+                        "is_read": False,
+                        "created_at": now,
+                    })
+            self._insert(TicketHistory, HISTORY_COPY_COLUMNS, history)
+            self._insert(Notification, NOTIFICATION_COPY_COLUMNS, notifications)
+            # id уведомлений после COPY неизвестны — подписчикам уходит только новый счётчик
+            adjust_unread(self.db, Counter(row["user_id"] for row in notifications))
+            stage_notifications(self.db, {row["user_id"] for row in notifications})
+
+        self.db.commit()
+        report.created += len(valid)
+        report.line = batch[-1][0]
+
+    def _insert_tickets(self, tickets: List[dict]) -> Dict[str, int]:
+        """Вставить заявки и вернуть {key: id}"""
+        if not self.use_copy:
+            rows = self.db.execute(insert(Ticket).returning(Ticket.id, Ticket.key), tickets).all()
+            return {key: ticket_id for ticket_id, key in rows}
+        _copy_rows(self.db, Ticket.__tablename__, TICKET_COPY_COLUMNS,
+                   [tuple(ticket[name] for name in TICKET_COPY_COLUMNS) for ticket in tickets])
+        keys = [ticket["key"] for ticket in tickets]
+        return {key: ticket_id for ticket_id, key in self.db.query(Ticket.id, Ticket.key).filter(Ticket.key.in_(keys))}
+
+    def _insert(self, model, columns: tuple, rows: List[dict]):
+        if not rows:
+            return
+        if self.use_copy:
+            _copy_rows(self.db, model.__tablename__, columns, [tuple(row[name] for name in columns) for row in rows])
+        else:
+            self.db.execute(insert(model), rows)
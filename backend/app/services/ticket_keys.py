@@ -0,0 +1,31 @@
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.models.user import Role
+
+
+roles_table = Role.__table__
+
+
+def allocate_ticket_numbers(db: Session, role_id: int, count: int = 1) -> int:
+    """
+    Атомарно выделить count номеров подряд для префикса роли: один
+    UPDATE ... RETURNING, без чтения-изменения-записи в Python и без commit.
+
+    Строка роли остаётся заблокированной до конца транзакции вызывающего,
+    поэтому номера без пропусков: откат возвращает их обратно. Ждут друг
+    друга только создатели заявок одного префикса, и только до своего commit.
+    Возвращает первый номер блока.
+    """
+    next_number = db.execute(
+        update(roles_table)
+        .where(roles_table.c.id == role_id)
+        .values(next_ticket_number=func.coalesce(roles_table.c.next_ticket_number, 1) + count)
+        .returning(roles_table.c.next_ticket_number)
+    ).scalar_one()
+    return next_number - count
+
+
+def allocate_ticket_key(db: Session, role: Role) -> str:
+    """Ключ новой заявки: PREFIX-NUMBER"""
+    return f"{role.prefix}-{allocate_ticket_numbers(db, role.id)}"
@@ -1,3 +1,7 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -5,11 +9,27 @@ from jose import JWTError, jwt
 import bcrypt
 
 from app.config import settings
+from app.utils.cache import TTLCache
+
+
+class PasswordHasherBusy(Exception):
+    """Очередь на хеширование паролей переполнена"""
+
+
+# Отдельный пул для bcrypt, чтобы логины не занимали общий threadpool Starlette.
+# bcrypt отпускает GIL, поэтому потоков достаточно.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_password_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT
+)
 
 
 def hash_password(password: str) -> str:
     pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(pwd_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -20,6 +40,47 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(pwd_bytes, hashed_bytes)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Хеш создан с другой стоимостью, чем BCRYPT_ROUNDS"""
+    # Формат: $2b$12$<salt+hash>
+    try:
+        cost = int(hashed_password.split('$')[2])
+    except (IndexError, ValueError):
+        return True
+    return cost != settings.BCRYPT_ROUNDS
+
+
+async def _run_password_task(func, *args):
+    """
+    Выполнить func в выделенном пуле. Ожидание идёт в event loop и не занимает
+    поток threadpool Starlette; сверх workers + queue_limit вызовов сразу
+    получают PasswordHasherBusy, а не копятся в очереди.
+    """
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        future = _password_executor.submit(func, *args)
+    except Exception:
+        _password_slots.release()
+        raise
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password в выделенном пуле"""
+    return await _run_password_task(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password в выделенном пуле"""
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+
+def shutdown_password_executor():
+    _password_executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     
@@ -40,13 +101,33 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+# Уже проверенные токены: токен -> payload. Запись живёт не дольше exp.
+_token_cache = TTLCache(
+    "verified_tokens",
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+
 def decode_token(token: str) -> Optional[dict]:
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return dict(payload)
+    
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+    
+    exp = payload.get("exp")
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    if exp is not None:
+        ttl = min(ttl, float(exp) - time.time())
+    if ttl > 0:
+        _token_cache.set(token, payload, ttl=ttl)
+    
+    return dict(payload)
@@ -0,0 +1,52 @@
+from typing import Any, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.schemas.comment import CommentItem, HistoryItem
+from app.schemas.ticket import TicketList, TicketPage
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+
+# Адаптеры создаются один раз: схема валидации/сериализации компилируется при импорте
+ticket_list_adapter = TypeAdapter(List[TicketList])
+ticket_page_adapter = TypeAdapter(TicketPage)
+comment_list_adapter = TypeAdapter(List[CommentItem])
+history_list_adapter = TypeAdapter(List[HistoryItem])
+
+
+def fast_serialization_enabled() -> bool:
+    return settings.FAST_SERIALIZATION
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse на orjson (если установлен)"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def to_jsonable(adapter: TypeAdapter, data: Any) -> Any:
+    """ORM-объекты -> JSON-совместимые dict/list (например, для кэша ответов)"""
+    return adapter.dump_python(adapter.validate_python(data, from_attributes=True), mode="json")
+
+
+def serialized_response(data: Any, adapter: Optional[TypeAdapter] = None, headers: Optional[dict] = None) -> Response:
+    """Готовый ответ в обход response_model и jsonable_encoder.
+
+    С adapter — ORM-объекты читаются один раз (from_attributes) и сразу
+    сериализуются в JSON на стороне pydantic-core. Без adapter — данные
+    считаются уже JSON-совместимыми (например, из кэша) и не валидируются.
+    """
+    if adapter is not None:
+        body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        return Response(content=body, media_type="application/json", headers=headers)
+    return FastJSONResponse(content=data, headers=headers)
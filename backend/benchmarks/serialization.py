@@ -0,0 +1,76 @@
+"""Микробенчмарк сериализации списка заявок.
+
+Сравнивает стандартный путь FastAPI (валидация response_model из ORM-объектов,
+jsonable_encoder, json.dumps) с быстрым (TypeAdapter.dump_json / orjson).
+
+Запуск из папки backend:
+    python -m benchmarks.serialization --rows 5000 --repeat 20
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.utils.serialization import ticket_list_adapter, FastJSONResponse
+
+
+def make_tickets(rows: int) -> list:
+    """Объекты с атрибутами как у ORM-модели Ticket (без БД)"""
+    now = datetime.utcnow()
+    users = [SimpleNamespace(id=i, login=f"user{i}", display_name=f"Пользователь {i}") for i in range(50)]
+    roles = [SimpleNamespace(id=i, name=f"role{i}", prefix=f"P{i}", display_name=f"Роль {i}") for i in range(5)]
+    return [
+        SimpleNamespace(
+            id=i,
+            key=f"P{i % 5}-{i}",
+            title=f"Заявка номер {i}",
+            status="open",
+            priority="medium",
+            author=users[i % 50],
+            assignee=users[(i + 7) % 50] if i % 3 else None,
+            role=roles[i % 5],
+            deadline=now + timedelta(days=i % 30),
+            time_spent=i * 60,
+            created_at=now - timedelta(minutes=i),
+        )
+        for i in range(rows)
+    ]
+
+
+def default_path(tickets: list) -> bytes:
+    # Как FastAPI: валидация по response_model -> jsonable_encoder -> JSONResponse.render
+    validated = ticket_list_adapter.validate_python(tickets, from_attributes=True)
+    content = jsonable_encoder(validated)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def adapter_path(tickets: list) -> bytes:
+    return ticket_list_adapter.dump_json(ticket_list_adapter.validate_python(tickets, from_attributes=True))
+
+
+def orjson_path(tickets: list) -> bytes:
+    validated = ticket_list_adapter.validate_python(tickets, from_attributes=True)
+    return FastJSONResponse(content=ticket_list_adapter.dump_python(validated)).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tickets = make_tickets(args.rows)
+    assert json.loads(default_path(tickets)) == json.loads(adapter_path(tickets))
+
+    baseline = None
+    for name, func in (("default", default_path), ("type_adapter", adapter_path), ("orjson", orjson_path)):
+        seconds = min(timeit.repeat(lambda: func(tickets), number=1, repeat=args.repeat))
+        baseline = baseline or seconds
+        print(f"{name:>14}: {seconds * 1000:8.2f} ms  x{baseline / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
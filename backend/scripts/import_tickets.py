@@ -0,0 +1,79 @@
+"""Импорт заявок из CSV/NDJSON (миграция из старого трекера).
+
+Поля записи — как у создания заявки: title, description, priority,
+assignee_id, deadline, role_id. Автор — пользователь --author.
+После каждой пачки прогресс пишется в файл контрольной точки; повторный
+запуск с тем же файлом продолжает с первой необработанной записи.
+
+Запуск из папки backend:
+    python -m scripts.import_tickets tickets.csv --author admin
+    python -m scripts.import_tickets tickets.ndjson --format ndjson --role-id 3
+"""
+import argparse
+import json
+import os
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.services.ticket_import import IMPORT_FORMATS, ImportReport, TicketImporter, read_records
+
+
+def load_checkpoint(path: str) -> ImportReport:
+    if not os.path.exists(path):
+        return ImportReport()
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    return ImportReport(line=state["line"], created=state["created"], failed=state["failed"], errors=state["errors"])
+
+
+def save_checkpoint(path: str, source: str, report: ImportReport):
+    # Пишем во временный файл и переименовываем — обрыв не оставит битый JSON
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"source": source, **report.to_dict()}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS)
+    parser.add_argument("--author", default="admin", help="логин автора заявок")
+    parser.add_argument("--role-id", type=int, help="роль для записей без role_id")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--checkpoint", help="по умолчанию <path>.checkpoint.json")
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    checkpoint = args.checkpoint or args.path + ".checkpoint.json"
+    report = load_checkpoint(checkpoint)
+
+    db = SessionLocal()
+    try:
+        author = db.query(User).filter(User.login == args.author).first()
+        if author is None:
+            parser.error(f"пользователь {args.author} не найден")
+
+        def on_progress(report: ImportReport):
+            save_checkpoint(checkpoint, args.path, report)
+            print(f"запись {report.line}: создано {report.created}, ошибок {report.failed}", flush=True)
+
+        if report.line:
+            print(f"продолжаем после записи {report.line}")
+        importer = TicketImporter(db, author, default_role_id=args.role_id, batch_size=args.batch_size)
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            report = importer.run(read_records(f, fmt), report, on_progress=on_progress)
+    finally:
+        db.close()
+
+    for error in report.errors:
+        print(f"  запись {error['line']}: {error['detail']}")
+    if report.aborted:
+        print(f"остановлено: {report.aborted}; создано {report.created}, ошибок {report.failed}")
+        print(f"повторный запуск продолжит после записи {report.line}")
+        raise SystemExit(1)
+    print(f"готово: создано {report.created}, ошибок {report.failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# PostgreSQL из окружения (CI) остаётся для проверок конкурентности — см. postgres_engine
+_external_database_url = os.environ.get("DATABASE_URL", "")
+
+# Тесты работают на отдельной SQLite-базе: схема — из моделей, без миграций
+_tmpdir = tempfile.mkdtemp(prefix="gerask-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/test.db"
+os.environ["DEBUG"] = "false"
+os.environ["LOG_FILE"] = f"{_tmpdir}/app.log"
+# Кэш ответов спрятал бы запросы обработчиков
+os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+# Минимальная стоимость bcrypt: тесты проверяют маршруты, а не стойкость хеша
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models.comment import Comment, Notification, TicketHistory
+from app.models.delete_request import DeleteRequest
+from app.models.ticket import Ticket, TicketStatus
+from app.models.ticket_link import TicketLink
+from app.models.user import Role, User
+from app.services.search import create_sqlite_search_schema
+from app.utils.security import create_access_token
+
+
+# Строк каждого вида в наборе данных: N+1 на таком объёме сразу выходит за бюджет
+SEED_SIZE = 25
+
+
+@event.listens_for(engine, "connect")
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    # Как в PostgreSQL: ON DELETE CASCADE действительно удаляет зависимые строки
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+@pytest.fixture(scope="session")
+def seeded():
+    """Роли, пользователи и SEED_SIZE заявок с комментариями, историей, связями и уведомлениями"""
+    Base.metadata.create_all(bind=engine)
+    create_sqlite_search_schema(engine)
+
+    db = SessionLocal()
+    try:
+        admin_role = Role(name="admin", display_name="Администратор", is_admin=True)
+        engineer_role = Role(name="engineer", display_name="Инженер", prefix="ASU",
+                             next_ticket_number=SEED_SIZE + 1)
+        db.add_all([admin_role, engineer_role])
+        db.flush()
+
+        admin = User(login="admin", password_hash="-", display_name="Admin", role_id=admin_role.id)
+        users = [
+            User(login=f"user{i}", password_hash="-", display_name=f"User {i}", role_id=engineer_role.id)
+            for i in range(SEED_SIZE)
+        ]
+        db.add(admin)
+        db.add_all(users)
+        db.flush()
+
+        now = datetime.utcnow()
+        tickets = [
+            Ticket(
+                key=f"ASU-{i + 1}",
+                title=f"Заявка {i + 1}",
+                description="Описание",
+                status=TicketStatus.OPEN.value,
+                author_id=users[i].id,
+                assignee_id=admin.id if i % 2 else users[(i + 1) % SEED_SIZE].id,
+                role_id=engineer_role.id,
+                created_at=now - timedelta(minutes=i),
+            )
+            for i in range(SEED_SIZE)
+        ]
+        db.add_all(tickets)
+        db.flush()
+
+        first = tickets[0]
+        for i, user in enumerate(users):
+            comment = Comment(ticket_id=first.id, author_id=user.id, content=f"Комментарий {i}")
+            db.add(comment)
+            db.add(TicketHistory(ticket_id=first.id, user_id=user.id, action="COMMENT_ADDED"))
+            db.add(TicketLink(source_ticket_id=first.id, target_ticket_id=tickets[i].id, created_by=user.id)
+                   if i else
+                   TicketLink(source_ticket_id=tickets[1].id, target_ticket_id=first.id, created_by=user.id))
+            db.add(DeleteRequest(ticket_id=tickets[i].id, requested_by=user.id))
+            db.add(Notification(user_id=admin.id, ticket_id=tickets[i].id, type="ASSIGNED",
+                                message=f"Вам назначена заявка {tickets[i].key}"))
+        admin.unread_notifications = SEED_SIZE
+        db.commit()
+        return {"admin_id": admin.id, "ticket_key": first.key}
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def client(seeded):
+    # Без with: lifespan (init_db, админ по умолчанию) в тестах не нужен
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def admin_headers(seeded):
+    token = create_access_token(data={"sub": str(seeded["admin_id"])})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def postgres_engine():
+    """Движок PostgreSQL из исходного DATABASE_URL; без неё тест пропускается"""
+    if not _external_database_url.startswith("postgresql"):
+        pytest.skip("нужна PostgreSQL в DATABASE_URL")
+    pg_engine = create_engine(_external_database_url, pool_size=16, max_overflow=0)
+    Base.metadata.create_all(bind=pg_engine)
+    yield pg_engine
+    pg_engine.dispose()
+
+
+@pytest.fixture
+def count_statements():
+    """Считает все SQL-запросы к тестовой базе внутри блока with"""
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
@@ -0,0 +1,36 @@
+import inspect
+import threading
+
+from app.routers.auth import login, register
+from app.routers.users import create_user_by_admin
+from app.utils import security
+
+
+def test_password_handlers_do_not_hold_threadpool_threads():
+    # Синхронный обработчик занял бы поток threadpool на всё время bcrypt
+    for handler in (register, login, create_user_by_admin):
+        assert inspect.iscoroutinefunction(handler)
+
+
+def test_register_then_login(client):
+    response = client.post("/api/auth/register", json={
+        "login": "newcomer", "password": "secret1", "password_confirm": "secret1",
+    })
+    assert response.status_code == 201
+    assert response.json()["role"]["name"] == "reader"
+
+    response = client.post("/api/auth/login", json={"login": "newcomer", "password": "secret1"})
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+    response = client.post("/api/auth/login", json={"login": "newcomer", "password": "wrong"})
+    assert response.status_code == 401
+
+
+def test_login_fails_fast_when_hasher_queue_is_full(client, monkeypatch):
+    monkeypatch.setattr(security, "_password_slots", threading.BoundedSemaphore(1))
+    security._password_slots.acquire()
+
+    response = client.post("/api/auth/login", json={"login": "admin", "password": "whatever"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,48 @@
+from app.database import SessionLocal
+from app.models.comment import Notification
+from app.models.ticket import Ticket
+
+
+def _statuses(*keys):
+    db = SessionLocal()
+    try:
+        return dict(db.query(Ticket.key, Ticket.status).filter(Ticket.key.in_(keys)).all())
+    finally:
+        db.close()
+
+
+def test_bulk_status_follows_single_ticket_transitions(client, admin_headers):
+    keys = ["ASU-20", "ASU-21"]
+    response = client.post("/api/tickets/bulk", headers=admin_headers,
+                           json={"keys": keys, "changes": {"status": "done"}})
+    assert response.status_code == 200
+    # Открытую заявку нельзя сразу решить — как и через /resolve
+    assert {item["result"] for item in response.json()} == {"invalid_transition"}
+    assert set(_statuses(*keys).values()) == {"open"}
+
+    response = client.post("/api/tickets/bulk", headers=admin_headers,
+                           json={"keys": keys, "changes": {"status": "in_progress"}})
+    assert [item["result"] for item in response.json()] == ["updated", "updated"]
+
+    response = client.post("/api/tickets/bulk", headers=admin_headers,
+                           json={"keys": keys, "changes": {"status": "done"}})
+    assert [item["result"] for item in response.json()] == ["updated", "updated"]
+    assert set(_statuses(*keys).values()) == {"done"}
+
+
+def test_bulk_notifications_record_actor(client, seeded, admin_headers):
+    response = client.post("/api/tickets/bulk", headers=admin_headers,
+                           json={"keys": ["ASU-22"], "changes": {"status": "in_progress"}})
+    assert response.json()[0]["result"] == "updated"
+    response = client.post("/api/tickets/bulk", headers=admin_headers,
+                           json={"keys": ["ASU-22"], "changes": {"status": "done"}})
+    assert response.json()[0]["result"] == "updated"
+
+    db = SessionLocal()
+    try:
+        notification = db.query(Notification).join(Ticket, Ticket.id == Notification.ticket_id).filter(
+            Ticket.key == "ASU-22", Notification.type == "STATUS_CHANGED"
+        ).one()
+        assert notification.last_actor_id == seeded["admin_id"]
+    finally:
+        db.close()
@@ -0,0 +1,13 @@
+import csv
+import io
+import json
+
+
+def test_export_formats_use_the_same_iso_datetimes(client, admin_headers):
+    ndjson = client.get("/api/tickets/export?format=ndjson&search=ASU-1", headers=admin_headers)
+    exported = csv.DictReader(io.StringIO(
+        client.get("/api/tickets/export?format=csv&search=ASU-1", headers=admin_headers).text.lstrip("\ufeff")
+    ))
+    row = json.loads(ndjson.text.splitlines()[0])
+    assert "T" in row["created_at"]
+    assert row["created_at"] == next(exported)["created_at"]
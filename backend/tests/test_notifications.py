@@ -0,0 +1,77 @@
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.models.comment import Notification
+from app.models.user import User
+
+
+def _unread_state(login: str):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.login == login).one()
+        rows = db.query(Notification).filter(Notification.user_id == user.id, Notification.is_read == False).count()
+        return user.unread_notifications, rows
+    finally:
+        db.close()
+
+
+def test_deleting_a_comment_keeps_the_unread_counter_in_sync(client, admin_headers):
+    before = _unread_state("user3")
+    response = client.post("/api/tickets/ASU-5/comments", headers=admin_headers, json={"content": "@user3 посмотри"})
+    assert response.status_code == 200
+    counter, rows = _unread_state("user3")
+    assert (counter, rows) == (before[0] + 1, before[1] + 1)
+
+    response = client.delete(f"/api/tickets/ASU-5/comments/{response.json()['id']}", headers=admin_headers)
+    assert response.status_code == 200
+    assert _unread_state("user3") == before
+
+
+def _comment_notifications(login: str, ticket_key: str):
+    db = SessionLocal()
+    try:
+        return [
+            (n.event_count, n.comment_id)
+            for n in db.query(Notification).join(User, User.id == Notification.user_id).filter(
+                User.login == login,
+                Notification.type == "COMMENT",
+                Notification.message.like(f"%{ticket_key}"),
+            )
+        ]
+    finally:
+        db.close()
+
+
+def test_deleting_the_latest_comment_of_a_folded_group_keeps_earlier_events(client, admin_headers):
+    # ASU-7: автор user6 получает COMMENT на каждый комментарий админа
+    before = _unread_state("user6")
+    first = client.post("/api/tickets/ASU-7/comments", headers=admin_headers, json={"content": "первый"}).json()
+    second = client.post("/api/tickets/ASU-7/comments", headers=admin_headers, json={"content": "второй"}).json()
+    assert _comment_notifications("user6", "ASU-7") == [(2, second["id"])]
+    assert _unread_state("user6") == (before[0] + 1, before[1] + 1)
+
+    response = client.delete(f"/api/tickets/ASU-7/comments/{second['id']}", headers=admin_headers)
+    assert response.status_code == 200
+    assert _comment_notifications("user6", "ASU-7") == [(1, None)]
+    assert _unread_state("user6") == (before[0] + 1, before[1] + 1)
+
+    client.delete(f"/api/tickets/ASU-7/comments/{first['id']}", headers=admin_headers)
+
+
+def test_comment_fan_out_is_one_insert(client, admin_headers):
+    inserts = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO notifications"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        # MENTION для user3 и COMMENT для автора и исполнителя ASU-9
+        response = client.post("/api/tickets/ASU-9/comments", headers=admin_headers, json={"content": "@user3 глянь"})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert len(inserts) == 1
+
+    client.delete(f"/api/tickets/ASU-9/comments/{response.json()['id']}", headers=admin_headers)
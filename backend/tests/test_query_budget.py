@@ -0,0 +1,42 @@
+"""
+Бюджет SQL-запросов на эндпоинт на наборе из SEED_SIZE строк.
+
+Связи списков должны грузиться фиксированным числом запросов (joinedload/selectinload):
+если сериализация начнёт подгружать author/assignee/role по одной строке,
+число запросов вырастет на SEED_SIZE и тест упадёт.
+"""
+import pytest
+
+from tests.conftest import SEED_SIZE
+
+
+ENDPOINT_BUDGETS = [
+    ("/api/tickets", 1),
+    ("/api/tickets?limit=10&count=exact", 2),
+    ("/api/tickets?fields=key,title,assignee", 1),
+    ("/api/tickets/my", 1),
+    ("/api/tickets/search?q=Заявка", 1),
+    ("/api/tickets/{key}", 2),
+    ("/api/tickets/{key}/full", 6),
+    ("/api/tickets/{key}/comments", 3),
+    ("/api/tickets/{key}/history", 3),
+    ("/api/tickets/{key}/links", 4),
+    ("/api/tickets/delete-requests", 1),
+    ("/api/tickets/notifications?limit=50", 1),
+    ("/api/users", 1),
+]
+
+
+@pytest.mark.parametrize("path, budget", ENDPOINT_BUDGETS)
+def test_endpoint_query_budget(client, seeded, admin_headers, count_statements, path, budget):
+    url = path.format(key=seeded["ticket_key"])
+    # Первый запрос прогревает кэши пользователя и справочников
+    assert client.get(url, headers=admin_headers).status_code == 200
+
+    before = count_statements.count
+    response = client.get(url, headers=admin_headers)
+    assert response.status_code == 200
+    used = count_statements.count - before
+    assert used <= budget, f"{url}: {used} SQL-запросов при бюджете {budget}"
+    assert budget < SEED_SIZE
+
@@ -0,0 +1,46 @@
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.database import Base
+from app.models.ticket import Ticket
+from app.services import search
+
+
+def test_create_all_builds_postgres_search_schema():
+    # Без Alembic схему создаёт create_all — колонка и индексы должны быть в модели
+    dialect = postgresql.dialect()
+    ddl = str(CreateTable(Ticket.__table__).compile(dialect=dialect))
+    assert "search_vector TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('simple'::regconfig" in ddl
+
+    indexes = {index.name: str(CreateIndex(index).compile(dialect=dialect)) for index in Ticket.__table__.indexes}
+    assert "USING gin (search_vector)" in indexes["ix_tickets_search_vector"]
+    assert "(key text_pattern_ops)" in indexes["ix_tickets_key_pattern"]
+
+
+def test_search_falls_back_to_ilike_without_search_schema(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "_backends", dict(search._backends))
+    engine = create_engine(f"sqlite:///{tmp_path}/bare.db")
+    Base.metadata.create_all(bind=engine)
+
+    search.check_search_schema(engine)
+    assert search.get_search_backend("sqlite") is None
+
+
+
+def test_title_trgm_index_supports_knn():
+    index = next(index for index in Ticket.__table__.indexes if index.name == "ix_tickets_title_trgm")
+    assert "USING gist (title gist_trgm_ops)" in str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+
+def test_short_suggest_queries_match_keys_only(client, admin_headers):
+    # Две буквы — триграмм нет, название не ищется
+    response = client.get("/api/tickets/suggest?q=За", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = client.get("/api/tickets/suggest?q=Заяв&limit=5", headers=admin_headers)
+    assert [item["title"][:6] for item in response.json()] == ["Заявка"] * 5
+
+    response = client.get("/api/tickets/suggest?q=AS&limit=3", headers=admin_headers)
+    assert [item["key"] for item in response.json()] == ["ASU-1", "ASU-10", "ASU-11"]
@@ -0,0 +1,37 @@
+from app.services.ticket_import import TicketImporter
+
+
+CSV_HEADER = "title,priority\n"
+
+
+def _csv(count: int) -> bytes:
+    return (CSV_HEADER + "".join(f"Импорт {i},low\n" for i in range(1, count + 1))).encode()
+
+
+def test_import_reports_progress_when_a_later_batch_fails(client, admin_headers, monkeypatch):
+    monkeypatch.setattr("app.config.settings.IMPORT_BATCH_SIZE", 2)
+    original = TicketImporter._insert_tickets
+    calls = []
+
+    def failing_second_batch(self, tickets):
+        calls.append(len(tickets))
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        return original(self, tickets)
+
+    monkeypatch.setattr(TicketImporter, "_insert_tickets", failing_second_batch)
+    response = client.post("/api/tickets/import?format=csv&role_id=2", headers=admin_headers,
+                           files={"file": ("tickets.csv", _csv(5), "text/csv")})
+    assert response.status_code == 500
+    report = response.json()
+    # Первая пачка закоммичена — продолжать нужно после записи 2
+    assert report["line"] == 2
+    assert report["created"] == 2
+    assert "connection lost" in report["aborted"]
+
+    monkeypatch.setattr(TicketImporter, "_insert_tickets", original)
+    response = client.post(f"/api/tickets/import?format=csv&role_id=2&start_after={report['line']}",
+                           headers=admin_headers, files={"file": ("tickets.csv", _csv(5), "text/csv")})
+    assert response.status_code == 200
+    assert response.json()["line"] == 5
+    assert response.json()["created"] == 3
@@ -0,0 +1,87 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.comment import TicketHistory
+from app.models.ticket import Ticket
+from app.models.user import Role, User
+from app.services.ticket_keys import allocate_ticket_key
+
+
+CREATES_PER_PREFIX = 100
+WORKERS = 16
+# Каждая такая транзакция откатывается: её номер должен вернуться в очередь
+ROLLBACK_EVERY = 10
+
+
+def create_one(Session, role_id: int, author_id: int, index: int):
+    """Как create_ticket: ключ, вставка заявки и истории, один commit"""
+    db = Session()
+    try:
+        role = db.get(Role, role_id)
+        key = allocate_ticket_key(db, role)
+        ticket = Ticket(key=key, title=f"stress {index}", author_id=author_id, role_id=role_id, time_spent=0)
+        db.add(ticket)
+        db.flush()
+        db.add(TicketHistory(ticket_id=ticket.id, user_id=author_id, action="CREATED", new_value=key))
+        if index % ROLLBACK_EVERY == 0:
+            db.rollback()
+            return role_id, None
+        db.commit()
+        return role_id, key
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def stress_roles(postgres_engine):
+    """Две временные роли с уникальными префиксами и автор; после теста всё удаляется"""
+    Session = sessionmaker(bind=postgres_engine, autoflush=False)
+    db = Session()
+    suffix = uuid.uuid4().hex[:6].upper()
+    roles = [Role(name=f"stress{n}{suffix}".lower(), display_name=f"Stress {n}", prefix=f"ST{n}{suffix}")
+             for n in range(2)]
+    db.add_all(roles)
+    db.flush()
+    author = User(login=f"stress{suffix}".lower(), password_hash="-", role_id=roles[0].id)
+    db.add(author)
+    db.commit()
+    role_ids = [role.id for role in roles]
+    try:
+        yield Session, role_ids, author.id
+    finally:
+        ticket_ids = db.query(Ticket.id).filter(Ticket.role_id.in_(role_ids))
+        db.query(TicketHistory).filter(TicketHistory.ticket_id.in_(ticket_ids)).delete(synchronize_session=False)
+        db.query(Ticket).filter(Ticket.role_id.in_(role_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id == author.id).delete(synchronize_session=False)
+        db.query(Role).filter(Role.id.in_(role_ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+def test_parallel_creates_get_unique_gap_free_keys(stress_roles):
+    Session, role_ids, author_id = stress_roles
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        futures = [
+            pool.submit(create_one, Session, role_id, author_id, index)
+            for index in range(1, CREATES_PER_PREFIX + 1)
+            for role_id in role_ids
+        ]
+        returned = [future.result() for future in futures]
+
+    db = Session()
+    try:
+        for role_id in role_ids:
+            committed = [key for owner, key in returned if owner == role_id and key is not None]
+            stored = [key for (key,) in db.query(Ticket.key).filter(Ticket.role_id == role_id)]
+            numbers = sorted(int(key.rsplit("-", 1)[1]) for key in stored)
+
+            assert len(committed) == len(set(committed))
+            assert sorted(committed) == sorted(stored)
+            assert numbers == list(range(1, len(committed) + 1))
+            assert db.get(Role, role_id).next_ticket_number == len(committed) + 1
+    finally:
+        db.close()